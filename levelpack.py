@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Level packs for the Tile Swap Puzzle.
+
+A pack holds any number of levels and is read one level at a time, so
+opening a pack of thousands of levels costs a header read, not a parse.
+
+File layout (little-endian):
+    header   magic b'SGLP', u16 version, u16 reserved, u32 count, u64 index_offset
+    records  one compact UTF-8 JSON object per level, back to back
+    index    count x (u64 offset, u32 length), pointing into records
+
+Build and check packs from the command line:
+    python levelpack.py build levels.json levels.pack
+    python levelpack.py validate levels.pack --jobs 4
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+MAGIC = b'SGLP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIQ')
+INDEX_ENTRY = struct.Struct('<QI')
+NUM_COLORS = 3
+GRID_SIZE = 3  # the game's board is GRID_SIZE x GRID_SIZE
+
+class PackError(Exception):
+    pass
+
+class LevelPack:
+    """Read-only, random-access view of a level pack.
+
+    Levels are decoded on first access and only the most recently used
+    few are kept, so the current and next level stay warm while the rest
+    of the pack is never parsed.
+    """
+    def __init__(self, path, keep=2):
+        self.path = path
+        self.keep = keep
+        self._cache = {}
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, AttributeError):
+            # No mmap (e.g. the browser build): fall back to seek and read.
+            self._data = None
+        header = self._read(0, HEADER.size)
+        if len(header) < HEADER.size:
+            raise PackError('%s: truncated header' % path)
+        magic, version, _, self.count, self.index_offset = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise PackError('%s: not a level pack' % path)
+        if version != VERSION:
+            raise PackError('%s: unsupported pack version %d' % (path, version))
+    def _read(self, offset, length):
+        if self._data is not None:
+            return self._data[offset:offset + length]
+        self._file.seek(offset)
+        return self._file.read(length)
+    def __len__(self):
+        return self.count
+    def entry(self, i):
+        """Return the (offset, length) of record i."""
+        if not 0 <= i < self.count:
+            raise IndexError('level %d out of range' % i)
+        raw = self._read(self.index_offset + i * INDEX_ENTRY.size, INDEX_ENTRY.size)
+        if len(raw) < INDEX_ENTRY.size:
+            raise PackError('%s: truncated index' % self.path)
+        return INDEX_ENTRY.unpack(raw)
+    def raw(self, i):
+        offset, length = self.entry(i)
+        return self._read(offset, length)
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        level = self._cache.pop(i, None)
+        if level is None:
+            level = json.loads(self.raw(i).decode('utf-8'))
+        self._cache[i] = level
+        while len(self._cache) > self.keep:
+            del self._cache[next(iter(self._cache))]
+        return level
+    def prefetch(self, i):
+        """Decode level i ahead of time if it exists."""
+        if 0 <= i < self.count:
+            self[i]
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        self._file.close()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+
+def write_pack(path, levels):
+    """Write an iterable of level dicts to path; return the level count."""
+    index = []
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        for level in levels:
+            record = json.dumps(level, separators=(',', ':')).encode('utf-8')
+            index.append((f.tell(), len(record)))
+            f.write(record)
+        index_offset = f.tell()
+        for offset, length in index:
+            f.write(INDEX_ENTRY.pack(offset, length))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(index), index_offset))
+    return len(index)
+
+def read_levels(path):
+    """Yield levels from a JSON list file or a JSON-lines file."""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+def check_level(level, num_colors=NUM_COLORS, grid_size=GRID_SIZE):
+    """Return a description of what is wrong with level, or None."""
+    solution = level.get('solution') if isinstance(level, dict) else None
+    if not isinstance(solution, list) or not solution:
+        return 'missing solution'
+    if len(solution) != grid_size:
+        return 'solution has %d rows, expected %d' % (len(solution), grid_size)
+    for row in solution:
+        if not isinstance(row, list) or len(row) != grid_size:
+            return 'solution is not %dx%d' % (grid_size, grid_size)
+        for value in row:
+            if not isinstance(value, int) or not 1 <= value <= num_colors:
+                return 'bad tile value %r' % (value,)
+    swaps = level.get('swaps')
+    if swaps is not None:
+        # A board of n tiles is never more than n - 1 swaps from solved.
+        if not isinstance(swaps, int) or isinstance(swaps, bool) or \
+                not 1 <= swaps < grid_size * grid_size:
+            return 'bad swaps %r' % (swaps,)
+    seed = level.get('seed')
+    if seed is not None and (not isinstance(seed, (int, str)) or isinstance(seed, bool)):
+        return 'bad seed %r' % (seed,)
+    return None
+
+def _validate_range(path, start, stop, num_colors, grid_size):
+    errors = []
+    with LevelPack(path, keep=0) as pack:
+        for i in range(start, stop):
+            try:
+                offset, length = pack.entry(i)
+                if offset < HEADER.size or offset + length > pack.index_offset:
+                    errors.append((i, 'record outside data area'))
+                    continue
+                problem = check_level(json.loads(pack.raw(i).decode('utf-8')), num_colors, grid_size)
+            except (ValueError, PackError) as e:
+                problem = str(e)
+            if problem:
+                errors.append((i, problem))
+    return errors
+
+def validate_pack(path, jobs=None, num_colors=NUM_COLORS, grid_size=GRID_SIZE):
+    """Check every level in path, splitting the work across processes.
+
+    Returns a sorted list of (level index, problem) pairs.
+    """
+    with LevelPack(path) as pack:
+        count = len(pack)
+    jobs = jobs or os.cpu_count() or 1
+    chunk = max(1, -(-count // jobs))
+    ranges = [(start, min(start + chunk, count)) for start in range(0, count, chunk)]
+    if jobs == 1 or len(ranges) <= 1:
+        return _validate_range(path, 0, count, num_colors, grid_size)
+    errors = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_validate_range, path, start, stop, num_colors, grid_size)
+                   for start, stop in ranges]
+        for future in futures:
+            errors.extend(future.result())
+    return errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build and validate Tile Swap level packs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='pack a .json or .jsonl level list')
+    build.add_argument('source')
+    build.add_argument('pack')
+    validate = commands.add_parser('validate', help='check every level in a pack')
+    validate.add_argument('pack')
+    validate.add_argument('--jobs', type=int, default=None)
+    validate.add_argument('--size', type=int, default=GRID_SIZE, help='expected board size (default %(default)s)')
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        count = write_pack(args.pack, read_levels(args.source))
+        print('wrote %d levels to %s' % (count, args.pack))
+        return 0
+    errors = validate_pack(args.pack, args.jobs, grid_size=args.size)
+    for i, problem in errors:
+        print('level %d: %s' % (i, problem))
+    print('%d problem(s)' % len(errors))
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
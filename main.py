@@ -5,8 +5,21 @@ Tile Swap Puzzle — Integrated UI & Fixed Mechanics
 - No overlap, clear instructions, centered grid
 - Reliable tap-to-swap mechanics
 """
+import argparse
+import asyncio
+import os
 import pygame
 import random
+import levelpack
+from levelpack import LevelPack
+import solver
+import sugargame.cache
+import sugargame.font
+import sugargame.surfacepool
+from sugargame.loop import run_async
+from sugargame.sync import Sync, UnixSocketTransport
+from sugargame.tween import Tween, Tweener, ease_out_quad
+from thumbnails import Thumbnails
 
 # --- CONFIG ---
 BG_GRADIENT_TOP = (36, 37, 130)
@@ -15,15 +28,26 @@ TITLE_COLOR = (255, 255, 255)
 PATTERN_BORDER = (220, 220, 240)
 TILE_COLORS = [(255, 99, 132), (54, 162, 235), (75, 192, 120)]  # red, blue, green
 SELECTED_BORDER = (255, 215, 0)
+HINT_BORDER = (255, 255, 255)
 INSTR_COLOR = (255,255,255)
 BUTTON_COLOR = (54, 162, 235)
 BUTTON_TEXT = (255, 255, 255)
 BUTTON_SHADOW = (36, 37, 130)
 BUTTON_HOVER = (40, 130, 210)
-GRID_SIZE = 3
+GRID_SIZE = levelpack.GRID_SIZE  # packs are validated against this size
 TILE_MARGIN = 14
+SWAP_DURATION = 120  # ms
 FONT_SIZE = 32
 TITLE_FONT_SIZE = 44
+GRID_TOP = 210
+DEFAULT_SWAPS = 4  # shuffle distance for levels that don't set "swaps"
+THUMB_SIZE = 112
+THUMB_COLUMNS = 3
+THUMB_GAP = 24
+THUMB_LABEL = 34  # room for the level number under each thumbnail
+SELECT_TOP = 140
+SELECT_BOTTOM = 680
+DRAG_THRESHOLD = 12  # px a press may move and still count as a tap
 
 LEVELS = [
     {"solution": [
@@ -42,37 +66,80 @@ LEVELS = [
         [1,2,3]
     ]},
 ]
+LEVEL_PACK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'levels.pack')
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'tile-swap-puzzle')
+
+def load_levels(path=LEVEL_PACK):
+    """Open the shipped level pack, or fall back to the built-in LEVELS."""
+    if os.path.exists(path):
+        return LevelPack(path)
+    return LEVELS
+
+# Rendered labels and backgrounds, counted against sugargame's cache budget.
+TEXT_CACHE = sugargame.cache.get_cache("text")
+BACKGROUND_CACHE = sugargame.cache.get_cache("background")
+
+def render_text(font, text, color):
+    return TEXT_CACHE.fetch((font, text, color), lambda: font.render(text, True, color))
+
+class Layout:
+    """Grid geometry for one screen size and grid size, computed once."""
+    def __init__(self, screen_size, grid_size=GRID_SIZE, margin=TILE_MARGIN, top=GRID_TOP):
+        w, h = screen_size
+        self.key = (w, h, grid_size)
+        self.grid_size = grid_size
+        self.margin = margin
+        self.tile_size = min((w-80 - (grid_size-1)*margin)//grid_size, (h-500 - (grid_size-1)*margin)//grid_size)
+        self.pitch = self.tile_size + margin
+        self.offset_x = w//2 - (self.tile_size*grid_size + margin*(grid_size-1))//2
+        self.offset_y = top
+        self.cells = [[pygame.Rect(self.offset_x + c*self.pitch, self.offset_y + r*self.pitch, self.tile_size, self.tile_size)
+                       for c in range(grid_size)] for r in range(grid_size)]
+    def cell_at(self, pos):
+        """Return the (row, col) under pos, or None for margins and outside the grid."""
+        c, dx = divmod(pos[0] - self.offset_x, self.pitch)
+        r, dy = divmod(pos[1] - self.offset_y, self.pitch)
+        if not (0 <= r < self.grid_size and 0 <= c < self.grid_size):
+            return None
+        if dx >= self.tile_size or dy >= self.tile_size:
+            return None
+        return (r, c)
 
 class Tile:
-    def __init__(self, row, col, value, size):
+    def __init__(self, row, col, value):
         self.row, self.col = row, col
         self.value = value
-        self.size = size
-        self.anim = 0
-        self.anim_offset = (0, 0)
-    def rect(self, offset_x, offset_y):
-        x = offset_x + self.col * (self.size + TILE_MARGIN) + self.anim_offset[0]
-        y = offset_y + self.row * (self.size + TILE_MARGIN) + self.anim_offset[1]
-        return pygame.Rect(x, y, self.size, self.size)
-    def draw(self, screen, offset_x, offset_y, highlight=False):
-        rect = self.rect(offset_x, offset_y)
+        self.slide = None
+    def rect(self, layout):
+        rect = layout.cells[self.row][self.col]
+        if self.slide is None:
+            return rect
+        # Slide offset is in cells so it survives a layout change mid-swap.
+        dc, dr = self.slide.value
+        return rect.move(round(dc * layout.pitch), round(dr * layout.pitch))
+    def draw(self, screen, layout, highlight=False, hint=False):
+        rect = self.rect(layout)
+        size = layout.tile_size
         shadow_rect = rect.move(4, 8)
         pygame.draw.rect(screen, (0,0,0,60), shadow_rect, border_radius=22)
         color = TILE_COLORS[self.value-1]
         pygame.draw.rect(screen, color, rect, border_radius=22)
-        glass = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-        pygame.draw.ellipse(glass, (255,255,255,60), (0,0,self.size,self.size//2))
-        screen.blit(glass, rect.topleft)
+        with sugargame.surfacepool.scratch((size, size), pygame.SRCALPHA) as glass:
+            pygame.draw.ellipse(glass, (255,255,255,60), (0,0,size,size//2))
+            screen.blit(glass, rect.topleft)
         if highlight:
             pygame.draw.rect(screen, SELECTED_BORDER, rect, 6, border_radius=22)
-    def animate_swap(self, target_pos=None):
-        if self.anim > 0 and target_pos:
-            dx = (target_pos[0] - self.col) * (self.size + TILE_MARGIN) / self.anim
-            dy = (target_pos[1] - self.row) * (self.size + TILE_MARGIN) / self.anim
-            self.anim_offset = (int(dx), int(dy))
-            self.anim -= 1
-        else:
-            self.anim_offset = (0, 0)
+        elif hint:
+            pygame.draw.rect(screen, HINT_BORDER, rect, 4, border_radius=22)
+    def slide_from(self, tweener, row, col):
+        """Animate this tile in from the cell at (row, col)."""
+        if self.slide is not None:
+            tweener.cancel(self.slide)
+        self.slide = tweener.add(Tween(SWAP_DURATION, (col - self.col, row - self.row), (0, 0),
+                                       easing=ease_out_quad, on_done=self._slide_done))
+    def _slide_done(self, tween):
+        if self.slide is tween:
+            self.slide = None
 
 class Button:
     def __init__(self, rect, text):
@@ -84,7 +151,7 @@ class Button:
         pygame.draw.rect(screen, BUTTON_SHADOW, shadow_rect, border_radius=20)
         color = BUTTON_HOVER if self.hover else BUTTON_COLOR
         pygame.draw.rect(screen, color, self.rect, border_radius=20)
-        label = font.render(self.text, True, BUTTON_TEXT)
+        label = render_text(font, self.text, BUTTON_TEXT)
         label_rect = label.get_rect(center=self.rect.center)
         screen.blit(label, label_rect)
     def check_hover(self, pos):
@@ -92,60 +159,167 @@ class Button:
     def is_clicked(self, pos):
         return self.rect.collidepoint(pos)
 
+class LevelSelect:
+    """Scrollable grid of level thumbnails; thumbnails render in the background."""
+    def __init__(self, screen, levels, thumbs, font, current):
+        self.screen = screen
+        self.levels = levels
+        self.thumbs = thumbs
+        self.font = font
+        self.current = current
+        self.pitch_x = THUMB_SIZE + THUMB_GAP
+        self.pitch_y = THUMB_SIZE + THUMB_LABEL + THUMB_GAP
+        self.rows = -(-len(levels) // THUMB_COLUMNS)
+        self.left = screen.get_width()//2 - (THUMB_COLUMNS*self.pitch_x - THUMB_GAP)//2
+        self.view = pygame.Rect(0, SELECT_TOP, screen.get_width(), SELECT_BOTTOM - SELECT_TOP)
+        self.back_btn = Button(pygame.Rect(40, 700, 160, 54), "Back")
+        self.press = None
+        self.dragging = False
+        # Open scrolled to the current level.
+        self.scroll = 0
+        self.scroll_by((current // THUMB_COLUMNS) * self.pitch_y - self.view.height//2 + self.pitch_y//2)
+    def scroll_by(self, dy):
+        limit = max(0, self.rows*self.pitch_y - THUMB_GAP - self.view.height)
+        self.scroll = max(0, min(limit, self.scroll + dy))
+    def visible_rows(self):
+        """Rows on screen, plus one below to load ahead of scrolling."""
+        first = self.scroll // self.pitch_y
+        last = (self.scroll + self.view.height) // self.pitch_y + 1
+        return range(first, min(self.rows, last + 1))
+    def thumb_rect(self, index):
+        r, c = divmod(index, THUMB_COLUMNS)
+        return pygame.Rect(self.left + c*self.pitch_x, self.view.top + r*self.pitch_y - self.scroll,
+                           THUMB_SIZE, THUMB_SIZE)
+    def index_at(self, pos):
+        if not self.view.collidepoint(pos):
+            return None
+        for r in self.visible_rows():
+            for i in range(r*THUMB_COLUMNS, min(len(self.levels), (r+1)*THUMB_COLUMNS)):
+                if self.thumb_rect(i).collidepoint(pos):
+                    return i
+        return None
+    def draw(self):
+        title = render_text(self.font, "Choose a level", TITLE_COLOR)
+        self.screen.blit(title, (self.screen.get_width()//2 - title.get_width()//2, 80))
+        wanted = set()
+        self.screen.set_clip(self.view)
+        for r in self.visible_rows():
+            for i in range(r*THUMB_COLUMNS, min(len(self.levels), (r+1)*THUMB_COLUMNS)):
+                wanted.add((i, THUMB_SIZE))
+                rect = self.thumb_rect(i)
+                thumb = self.thumbs.get(i, THUMB_SIZE)
+                if thumb is None:
+                    pygame.draw.rect(self.screen, PATTERN_BORDER, rect, 3, border_radius=14)
+                else:
+                    self.screen.blit(thumb, rect.topleft)
+                if i == self.current:
+                    pygame.draw.rect(self.screen, SELECTED_BORDER, rect.inflate(10, 10), 4, border_radius=16)
+                label = render_text(self.font, str(i+1), TITLE_COLOR)
+                self.screen.blit(label, (rect.centerx - label.get_width()//2, rect.bottom + 4))
+        self.screen.set_clip(None)
+        # Don't render levels that were scrolled past before their turn came.
+        self.thumbs.cancel_except(wanted)
+        self.back_btn.draw(self.screen, self.font)
+    def handle_event(self, event):
+        """Return the chosen level index, -1 for Back, or None."""
+        if event.type == pygame.MOUSEWHEEL:
+            self.scroll_by(-event.y * self.pitch_y // 2)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.press = event.pos
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.press is not None:
+            # Touch screens have no wheel: dragging scrolls.
+            if abs(event.pos[1] - self.press[1]) > DRAG_THRESHOLD:
+                self.dragging = True
+            if self.dragging:
+                self.scroll_by(-event.rel[1])
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.press is not None:
+            self.press = None
+            if self.dragging:
+                return None
+            if self.back_btn.is_clicked(event.pos):
+                return -1
+            return self.index_at(event.pos)
+        return None
+
 class SwapPuzzleGame:
-    def __init__(self):
+    def __init__(self, transport=None, host=True):
         pygame.init()
         self.screen = pygame.display.set_mode((440, 800))
         pygame.display.set_caption("Tile Swap Puzzle")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Nunito", FONT_SIZE, bold=True)
-        self.title_font = pygame.font.SysFont("Nunito", TITLE_FONT_SIZE, bold=True)
-        self.instr_font = pygame.font.SysFont("Nunito", 26)
+        # Font lookups are remembered in CACHE_DIR, skipping the system font scan.
+        sugargame.font.set_cache_dir(CACHE_DIR)
+        self.font = sugargame.font.SysFont("Nunito", FONT_SIZE, bold=True)
+        self.title_font = sugargame.font.SysFont("Nunito", TITLE_FONT_SIZE, bold=True)
+        self.instr_font = sugargame.font.SysFont("Nunito", 26)
+        self.levels = load_levels()
         self.level = 0
         self.selected = None
         self.moves = 0
         self.solved = False
-        self.animating = False
-        self.last_swap = None
+        self.tweener = Tweener()
+        self.layout = None
+        self.thumbs = None
+        self.picker = None
+        self.level_rect = pygame.Rect(0, 0, 0, 0)
+        # Created after pygame.init(), so remote messages have an event queue.
+        self.sync = Sync(transport, host=host) if transport is not None else None
         self.reset()
         self.restart_btn = Button(pygame.Rect(40, 700, 160, 54), "Restart")
         self.next_btn = Button(pygame.Rect(240, 700, 160, 54), "Next")
+        self.hint_btn = Button(pygame.Rect(240, 700, 160, 54), "Hint")
     def reset(self):
-        self.solution = [row[:] for row in LEVELS[self.level]["solution"]]
-        flat = sum(self.solution, [])
+        level = self.levels[self.level]
+        self.solution = [row[:] for row in level["solution"]]
+        if hasattr(self.levels, 'prefetch'):
+            self.levels.prefetch(self.level + 1)
+        rng = random.Random(level.get("seed"))
+        swaps = level.get("swaps", DEFAULT_SWAPS)
         while True:
-            random.shuffle(flat)
-            grid = [flat[i*GRID_SIZE:(i+1)*GRID_SIZE] for i in range(GRID_SIZE)]
-            if grid != self.solution:
+            try:
+                flat = solver.shuffle(self.solution, swaps, rng)
                 break
-        self.grid = [[Tile(r, c, grid[r][c], self.tile_size()) for c in range(GRID_SIZE)] for r in range(GRID_SIZE)]
+            except ValueError:
+                # Pattern can't be pushed that far; ask for less.
+                swaps -= 1
+        grid = [flat[i*GRID_SIZE:(i+1)*GRID_SIZE] for i in range(GRID_SIZE)]
+        self.par = swaps
+        self.hint = None
+        self.grid = [[Tile(r, c, grid[r][c]) for c in range(GRID_SIZE)] for r in range(GRID_SIZE)]
         self.selected = None
         self.moves = 0
         self.solved = False
-        self.animating = False
-        self.last_swap = None
-    def tile_size(self):
-        w, h = self.screen.get_size()
-        size = min((w-80 - (GRID_SIZE-1)*TILE_MARGIN)//GRID_SIZE, (h-500 - (GRID_SIZE-1)*TILE_MARGIN)//GRID_SIZE)
-        return size
+        self.tweener.clear()
+    def get_layout(self):
+        # Rebuilt only when the screen or grid size changes.
+        key = self.screen.get_size() + (GRID_SIZE,)
+        if self.layout is None or self.layout.key != key:
+            self.layout = Layout(self.screen.get_size(), GRID_SIZE)
+        return self.layout
     def draw_gradient_bg(self):
+        bg = BACKGROUND_CACHE.fetch(self.screen.get_size(), self.make_gradient_bg)
+        self.screen.blit(bg, (0, 0))
+    def make_gradient_bg(self):
         w, h = self.screen.get_size()
+        bg = pygame.Surface((w, h)).convert()
         for y in range(h):
             ratio = y/h
             r = int(BG_GRADIENT_TOP[0]*(1-ratio) + BG_GRADIENT_BOTTOM[0]*ratio)
             g = int(BG_GRADIENT_TOP[1]*(1-ratio) + BG_GRADIENT_BOTTOM[1]*ratio)
             b = int(BG_GRADIENT_TOP[2]*(1-ratio) + BG_GRADIENT_BOTTOM[2]*ratio)
-            pygame.draw.line(self.screen, (r,g,b), (0,y), (w,y))
+            pygame.draw.line(bg, (r,g,b), (0,y), (w,y))
+        return bg
     def draw_title(self):
-        label = self.title_font.render("Tile Swap Puzzle", True, TITLE_COLOR)
+        label = render_text(self.title_font, "Tile Swap Puzzle", TITLE_COLOR)
         self.screen.blit(label, (self.screen.get_width()//2 - label.get_width()//2, 28))
-    def draw_top_bar(self, tile_size):
-        moves = self.font.render(f"Moves: {self.moves}", True, TITLE_COLOR)
-        level = self.font.render(f"Level: {self.level+1} of {len(LEVELS)}", True, TITLE_COLOR)
+    def draw_top_bar(self, layout):
+        moves = render_text(self.font, f"Moves: {self.moves}", TITLE_COLOR)
+        level = render_text(self.font, f"Level: {self.level+1} of {len(self.levels)}", TITLE_COLOR)
         self.screen.blit(moves, (32, 80))
-        self.screen.blit(level, (self.screen.get_width()//2 - level.get_width()//2, 80))
+        self.level_rect = self.screen.blit(level, (self.screen.get_width()//2 - level.get_width()//2, 80))
         # Compact pattern preview (right-aligned)
-        preview_tile = tile_size // 4
+        preview_tile = layout.tile_size // 4
         preview_w = preview_tile * GRID_SIZE + 6
         preview_h = preview_tile * GRID_SIZE + 6
         preview_x = self.screen.get_width() - preview_w - 24
@@ -160,97 +334,210 @@ class SwapPuzzleGame:
                     preview_tile-2, preview_tile-2)
                 pygame.draw.rect(self.screen, color, rect, border_radius=6)
     def draw_instructions(self):
-        instr = self.instr_font.render("Tap two tiles to swap and match the pattern", True, INSTR_COLOR)
+        instr = render_text(self.instr_font, "Tap two tiles to swap and match the pattern", INSTR_COLOR)
         self.screen.blit(instr, (self.screen.get_width()//2 - instr.get_width()//2, 140))
-    def draw_grid(self, tile_size):
-        offset_x = self.screen.get_width()//2 - (tile_size*GRID_SIZE + TILE_MARGIN*(GRID_SIZE-1))//2
-        offset_y = 210
+    def draw_grid(self, layout):
         for r in range(GRID_SIZE):
             for c in range(GRID_SIZE):
                 highlight = self.selected == (r, c)
-                self.grid[r][c].size = tile_size
-                if self.last_swap and (r, c) in self.last_swap:
-                    target = self.last_swap[(r, c)]
-                    self.grid[r][c].animate_swap(target)
-                else:
-                    self.grid[r][c].animate_swap()
-                self.grid[r][c].draw(self.screen, offset_x, offset_y, highlight=highlight)
+                hint = self.hint is not None and (r, c) in self.hint
+                self.grid[r][c].draw(self.screen, layout, highlight=highlight, hint=hint)
     def draw_buttons(self):
         self.restart_btn.draw(self.screen, self.font)
         if self.solved:
             self.next_btn.draw(self.screen, self.font)
+        else:
+            self.hint_btn.draw(self.screen, self.font)
     def draw_solved(self):
         if self.solved:
-            msg = self.font.render("Solved!", True, (255,255,255))
+            msg = render_text(self.font, f"Solved! Best possible: {self.par}", (255,255,255))
             self.screen.blit(msg, (self.screen.get_width()//2 - msg.get_width()//2, 630))
     def draw(self):
         self.draw_gradient_bg()
-        tile_size = self.tile_size()
+        if self.picker is not None:
+            self.picker.draw()
+            pygame.display.flip()
+            return
+        layout = self.get_layout()
         self.draw_title()
-        self.draw_top_bar(tile_size)
+        self.draw_top_bar(layout)
         self.draw_instructions()
-        self.draw_grid(tile_size)
+        self.draw_grid(layout)
         self.draw_solved()
         self.draw_buttons()
         pygame.display.flip()
+    def board(self):
+        return [[tile.value for tile in row] for row in self.grid]
+    def show_hint(self):
+        swap = solver.hint(self.board(), self.solution)
+        if swap is not None:
+            self.hint = tuple(divmod(i, GRID_SIZE) for i in swap)
+    def shared_state(self):
+        # Cells are keyed by flat index, so a swap sends two small entries.
+        state = {"level": self.level, "moves": self.moves}
+        for r in range(GRID_SIZE):
+            for c in range(GRID_SIZE):
+                state[r*GRID_SIZE + c] = self.grid[r][c].value
+        return state
+    def apply_remote(self, changes):
+        """Take on the host's level and board."""
+        if not changes:
+            return
+        state = self.sync.state
+        if state.get("level", self.level) != self.level:
+            self.level = state["level"]
+            self.reset()
+        self.moves = state.get("moves", self.moves)
+        moved = []
+        for r in range(GRID_SIZE):
+            for c in range(GRID_SIZE):
+                value = state.get(r*GRID_SIZE + c)
+                if value is not None and self.grid[r][c].value != value:
+                    self.grid[r][c].value = value
+                    moved.append((r, c))
+        if len(moved) == 2:
+            (r0, c0), (r, c) = moved
+            self.grid[r0][c0].slide_from(self.tweener, r, c)
+            self.grid[r][c].slide_from(self.tweener, r0, c0)
+        if moved:
+            self.selected = None
+            self.hint = None
+        self.solved = self.check_solution()
+    def act(self, action):
+        """Make a move here, or ask the host to when playing someone else's shared game."""
+        if self.sync is not None and not self.sync.host:
+            self.sync.send_action(action)
+        else:
+            self.perform(action)
+    def perform(self, action):
+        """Make a move: ["swap", i, j], ["level", n] or ["restart"]; others are ignored."""
+        if not isinstance(action, list) or not action:
+            return
+        n = GRID_SIZE * GRID_SIZE
+        kind, args = action[0], action[1:]
+        if not all(isinstance(arg, int) for arg in args):
+            return
+        if kind == "swap" and len(args) == 2 and all(0 <= i < n for i in args) and args[0] != args[1]:
+            (r0, c0), (r, c) = divmod(args[0], GRID_SIZE), divmod(args[1], GRID_SIZE)
+            self.grid[r0][c0].value, self.grid[r][c].value = self.grid[r][c].value, self.grid[r0][c0].value
+            # Animate slide
+            self.grid[r0][c0].slide_from(self.tweener, r, c)
+            self.grid[r][c].slide_from(self.tweener, r0, c0)
+            self.selected = None
+            self.hint = None
+            self.moves += 1
+            self.solved = self.check_solution()
+        elif kind == "level" and len(args) == 1 and 0 <= args[0] < len(self.levels):
+            self.level = args[0]
+            self.reset()
+        elif kind == "restart" and not args:
+            self.reset()
     def check_solution(self):
         for r in range(GRID_SIZE):
             for c in range(GRID_SIZE):
                 if self.grid[r][c].value != self.solution[r][c]:
                     return False
         return True
+    def open_picker(self):
+        if self.thumbs is None:
+            # Worker processes start on first use, not at launch.
+            self.thumbs = Thumbnails(self.levels, TILE_COLORS, os.path.join(CACHE_DIR, 'thumbs'))
+        self.picker = LevelSelect(self.screen, self.levels, self.thumbs, self.font, self.level)
+    def handle_picker(self, event):
+        choice = self.picker.handle_event(event)
+        if choice is None:
+            return
+        self.picker = None
+        if choice >= 0:
+            self.act(["level", choice])
     def handle_tap(self, pos):
         self.restart_btn.check_hover(pos)
         self.next_btn.check_hover(pos)
+        self.hint_btn.check_hover(pos)
         if self.restart_btn.is_clicked(pos):
-            self.reset()
+            self.act(["restart"])
+            return
+        if self.level_rect.collidepoint(pos):
+            self.open_picker()
             return
         if self.solved and self.next_btn.is_clicked(pos):
-            if self.level < len(LEVELS)-1:
-                self.level += 1
-                self.reset()
-            else:
-                self.level = 0
-                self.reset()
+            self.act(["level", (self.level + 1) % len(self.levels)])
             return
         if self.solved:
             return
-        tile_size = self.tile_size()
-        offset_x = self.screen.get_width()//2 - (tile_size*GRID_SIZE + TILE_MARGIN*(GRID_SIZE-1))//2
-        offset_y = 210
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                if self.grid[r][c].rect(offset_x, offset_y).collidepoint(pos):
-                    if self.selected is None:
-                        self.selected = (r, c)
-                    elif self.selected != (r, c):
-                        r0, c0 = self.selected
-                        # Animate slide
-                        self.grid[r0][c0].anim = self.grid[r][c].anim = 6
-                        self.last_swap = {(r0, c0): (r, c), (r, c): (r0, c0)}
-                        self.grid[r0][c0].value, self.grid[r][c].value = self.grid[r][c].value, self.grid[r0][c0].value
-                        self.selected = None
-                        self.moves += 1
-                        if self.check_solution():
-                            self.solved = True
-                        pygame.time.set_timer(pygame.USEREVENT, 90)
-                    else:
-                        # Deselect if the same tile is tapped twice
-                        self.selected = None
-                    return
+        if self.hint_btn.is_clicked(pos):
+            self.show_hint()
+            return
+        cell = self.get_layout().cell_at(pos)
+        if cell is None:
+            return
+        r, c = cell
+        if self.selected is None:
+            self.selected = (r, c)
+        elif self.selected != (r, c):
+            r0, c0 = self.selected
+            self.selected = None
+            self.act(["swap", r0*GRID_SIZE + c0, r*GRID_SIZE + c])
+        else:
+            # Deselect if the same tile is tapped twice
+            self.selected = None
+    def frame(self, events, dt):
+        """Handle one frame's events and animation; return False to quit."""
+        animating = not self.tweener.is_idle()
+        for event in events:
+            if event.type == pygame.QUIT:
+                if self.thumbs is not None:
+                    self.thumbs.close()
+                if self.sync is not None:
+                    self.sync.close()
+                return False
+            elif self.sync is not None and event.type == self.sync.event_type:
+                self.apply_remote(self.sync.apply(event))
+                if self.sync.host:
+                    # Actions are performed in the order they arrived.
+                    for action in event.actions:
+                        self.perform(action)
+            elif self.thumbs is not None and self.thumbs.handle_event(event):
+                pass  # a thumbnail arrived; redrawn below
+            elif self.picker is not None:
+                self.handle_picker(event)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self.handle_tap(event.pos)
+        self.tweener.update(dt)
+        if self.sync is not None:
+            self.sync.update(self.shared_state() if self.sync.host else None)
+        if events or animating:
+            self.draw()
+        return True
     def run(self):
         running = True
+        self.draw()
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    self.handle_tap(event.pos)
-                elif event.type == pygame.USEREVENT:
-                    self.last_swap = None
-                    pygame.time.set_timer(pygame.USEREVENT, 0)
-            self.draw()
-            self.clock.tick(60)
+            if self.tweener.is_idle() and not (self.sync and self.sync.pending()):
+                # Nothing is moving or waiting to be sent: sleep until there is input.
+                events = [pygame.event.wait()] + pygame.event.get()
+                self.clock.tick()
+            else:
+                events = pygame.event.get()
+            running = self.frame(events, self.clock.tick(60))
+    async def run_async(self):
+        """Non-blocking main loop for the browser build; also works natively."""
+        self.draw()
+        await run_async(lambda dt: self.frame(pygame.event.get(), dt), fps=60)
+
+def open_transport(path):
+    """Join the game shared at the Unix socket path, or host one there; return (transport, host)."""
+    try:
+        return UnixSocketTransport(path), False
+    except OSError:
+        return UnixSocketTransport(path, listen=True), True
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tile Swap Puzzle.')
+    parser.add_argument('--share', metavar='SOCKET', help='play together with other instances started with the same socket path')
+    args = parser.parse_args(argv)
+    transport, host = open_transport(args.share) if args.share else (None, True)
+    await SwapPuzzleGame(transport, host).run_async()
 
 if __name__ == '__main__':
-    SwapPuzzleGame().run()
+    asyncio.run(main())
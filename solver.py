@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Minimum-swap solver and shuffle generator for the Tile Swap Puzzle.
+
+Any two tiles may be swapped, and tiles of the same colour are
+interchangeable.  Each misplaced tile is an edge from its colour to the
+colour its cell needs; a swap can close at most one cycle of that graph,
+so the minimum number of swaps is the number of misplaced tiles minus the
+largest number of edge-disjoint cycles they split into.  Two-cycles are
+always part of some best split and are taken greedily; what remains is
+searched exhaustively over colour-count states, memoised.  The search
+is instant for the three colours the game uses and grows steeply with
+the number of colours, not with board size.
+
+Benchmark with:
+    python solver.py --bench
+"""
+import argparse
+import random
+import sys
+import time
+from functools import lru_cache
+
+def _flatten(grid):
+    if grid and isinstance(grid[0], list):
+        return [value for row in grid for value in row]
+    return list(grid)
+
+def _mismatch_counts(board, target):
+    """Return (misplaced tiles, sorted colours, flat colour->colour edge counts)."""
+    colours = sorted(set(board) | set(target))
+    slot = {colour: i for i, colour in enumerate(colours)}
+    k = len(colours)
+    counts = [0] * (k * k)
+    misplaced = 0
+    for have, want in zip(board, target):
+        if have != want:
+            counts[slot[have] * k + slot[want]] += 1
+            misplaced += 1
+    return misplaced, k, counts
+
+def _cycles_through(counts, k, start, first):
+    """Yield simple cycles (as edge lists) that use the edge start -> first."""
+    stack = [(first, [(start, first)], {start, first})]
+    while stack:
+        node, edges, seen = stack.pop()
+        if counts[node * k + start]:
+            yield edges + [(node, start)]
+        for nxt in range(k):
+            if nxt not in seen and counts[node * k + nxt]:
+                stack.append((nxt, edges + [(node, nxt)], seen | {nxt}))
+
+@lru_cache(maxsize=65536)
+def _max_cycles(counts, k):
+    counts = list(counts)
+    total = 0
+    # Two-cycles first: some maximum decomposition always contains them.
+    for a in range(k):
+        for b in range(a + 1, k):
+            pairs = min(counts[a * k + b], counts[b * k + a])
+            if pairs:
+                counts[a * k + b] -= pairs
+                counts[b * k + a] -= pairs
+                total += pairs
+    edge = next((i for i, n in enumerate(counts) if n), None)
+    if edge is None:
+        return total
+    start, first = divmod(edge, k)
+    # With no two-cycles left every cycle uses at least three edges.
+    bound = sum(counts) // 3
+    best = 0
+    # Every decomposition puts this edge in some cycle; try each,
+    # shortest first, and stop once the bound is reached.
+    for cycle in sorted(_cycles_through(counts, k, start, first), key=len):
+        rest = counts[:]
+        for a, b in cycle:
+            rest[a * k + b] -= 1
+        best = max(best, 1 + _max_cycles(tuple(rest), k))
+        if best == bound:
+            break
+    return total + best
+
+def min_swaps(board, target):
+    """Return the fewest swaps that turn board into target.
+
+    Both may be flat lists or lists of rows, with the same multiset of
+    colours.
+    """
+    board, target = _flatten(board), _flatten(target)
+    if sorted(board) != sorted(target):
+        raise ValueError('board and target hold different tiles')
+    misplaced, k, counts = _mismatch_counts(board, target)
+    if not misplaced:
+        return 0
+    return misplaced - _max_cycles(tuple(counts), k)
+
+def hint(board, target):
+    """Return a pair of flat indices whose swap is on a shortest solution, or None."""
+    board, target = _flatten(board), _flatten(target)
+    wrong = [i for i, (have, want) in enumerate(zip(board, target)) if have != want]
+    if not wrong:
+        return None
+    # A swap that puts both tiles in place is always optimal.
+    for i in wrong:
+        for j in wrong:
+            if board[i] == target[j] and board[j] == target[i]:
+                return (i, j)
+    distance = min_swaps(board, target)
+    for i in wrong:
+        for j in wrong:
+            if board[i] == target[j] and board[j] != board[i]:
+                board[i], board[j] = board[j], board[i]
+                better = min_swaps(board, target) == distance - 1
+                board[i], board[j] = board[j], board[i]
+                if better:
+                    return (i, j)
+    return None
+
+def _walk(target, swaps, rng):
+    board = target[:]
+    n = len(board)
+    for distance in range(swaps):
+        for _ in range(4 * n):
+            i, j = rng.randrange(n), rng.randrange(n)
+            if board[i] == board[j]:
+                continue
+            board[i], board[j] = board[j], board[i]
+            if min_swaps(board, target) == distance + 1:
+                break
+            board[i], board[j] = board[j], board[i]
+        else:
+            # Random probing failed; scan all pairs before giving up.
+            pairs = [(i, j) for i in range(n) for j in range(i + 1, n) if board[i] != board[j]]
+            rng.shuffle(pairs)
+            for i, j in pairs:
+                board[i], board[j] = board[j], board[i]
+                if min_swaps(board, target) == distance + 1:
+                    break
+                board[i], board[j] = board[j], board[i]
+            else:
+                return None
+    return board
+
+def shuffle(target, swaps, seed=None, attempts=8):
+    """Return a flat shuffle of target exactly `swaps` swaps away from it.
+
+    The same seed gives the same shuffle.  Raises ValueError when no
+    shuffle that far was found (e.g. on a single-colour board).
+    """
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    target = _flatten(target)
+    for _ in range(attempts):
+        # A walk can dead-end below the board's maximum; start over.
+        board = _walk(target, swaps, rng)
+        if board is not None:
+            return board
+    raise ValueError('cannot shuffle %d swaps away' % swaps)
+
+def benchmark(sizes=(3, 4, 6, 8, 16, 32, 64), colours=(3, 4, 5), repeat=20, out=sys.stdout):
+    rng = random.Random(0)
+    print('%6s %8s %14s %14s' % ('board', 'colours', 'min_swaps us', 'shuffle ms'), file=out)
+    for size in sizes:
+        for k in colours:
+            target = [rng.randint(1, k) for _ in range(size * size)]
+            boards = []
+            for _ in range(repeat):
+                board = target[:]
+                rng.shuffle(board)
+                boards.append(board)
+            _max_cycles.cache_clear()
+            start = time.perf_counter()
+            for board in boards:
+                min_swaps(board, target)
+            solve_us = (time.perf_counter() - start) / repeat * 1e6
+            swaps = min(size * size // 4, 10)
+            start = time.perf_counter()
+            shuffle(target, swaps, seed=size)
+            shuffle_ms = (time.perf_counter() - start) * 1e3
+            print('%3dx%-3d %8d %14.1f %14.2f' % (size, size, k, solve_us, shuffle_ms), file=out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tile Swap Puzzle solver.')
+    parser.add_argument('--bench', action='store_true', help='time the solver on 3x3 to 64x64 boards')
+    args = parser.parse_args(argv)
+    if args.bench:
+        benchmark()
+        return 0
+    parser.print_help()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,3 +21,16 @@
 #
 
 __version__ = '1.3'
+
+# Submodules are imported on first attribute access, so "import sugargame"
+# does not pull in GTK, Sugar or pygame.
+_SUBMODULES = ('assets', 'cache', 'canvas', 'capture', 'event',
+               'eventqueue', 'executor', 'font', 'loop', 'offscreen',
+               'sound', 'surfacepool', 'sync', 'tween')
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        import importlib
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
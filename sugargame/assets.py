@@ -0,0 +1,92 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Images converted to the display's pixel format.
+
+Blitting a surface whose format differs from the display's converts every
+pixel on every blit.  load_image() converts each image once, keeps it in
+the 'assets' cache (see sugargame.cache), and converts it again if the
+display format has changed since.  Surfaces already handed out are not
+converted again, so games should call load_image() again after
+set_mode() rather than keep the surfaces it returned.
+
+    ball = sugargame.assets.load_image('images/ball.png')
+"""
+
+import pygame
+
+import sugargame.cache
+
+_assets = sugargame.cache.get_cache(
+    'assets', get_size=lambda entry: sugargame.cache.surface_bytes(entry[1]))
+
+
+def display_format():
+    """Return a value identifying the display's pixel format, or None."""
+    screen = pygame.display.get_surface()
+    if screen is None:
+        return None
+    return (screen.get_bitsize(), screen.get_masks())
+
+
+def has_alpha(surface):
+    return bool(surface.get_flags() & pygame.SRCALPHA)
+
+
+def convert(surface, alpha=None):
+    """
+    Return surface converted to the display format.  alpha keeps
+    per-pixel transparency; by default it is kept if surface has it.
+    Before a display exists surface is returned unchanged.
+    """
+    screen = pygame.display.get_surface()
+    if screen is None:
+        return surface
+    if alpha is None:
+        alpha = has_alpha(surface)
+    if not alpha:
+        return surface.convert(screen)
+    try:
+        return surface.convert_alpha()
+    except pygame.error:
+        # No SDL video mode has been set: use the 32-bit layout the
+        # 'cairo' canvas backend's offscreen display shares with cairo.
+        out = pygame.Surface(surface.get_size(), pygame.SRCALPHA, 32)
+        out.blit(surface, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        return out
+
+
+def load_image(path, alpha=None):
+    """
+    Return the image at path converted to the display format, loading
+    and converting it only the first time or when the format changed.
+    A surface returned before a format change keeps the old format.
+    """
+    key = (path, alpha)
+    fmt = display_format()
+    entry = _assets.get(key)
+    if entry is not None and entry[0] == fmt:
+        return entry[1]
+    surface = convert(pygame.image.load(path), alpha)
+    _assets.put(key, (fmt, surface))
+    return surface
@@ -0,0 +1,178 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Caches sharing one memory budget.
+
+Every cache made with get_cache() is registered with a single registry
+that counts the bytes each holds.  When the total goes over the budget the
+least recently used entry across all caches is evicted, so a game's many
+small caches cannot together exhaust a low-memory machine.
+
+    labels = sugargame.cache.get_cache('labels')
+    label = labels.fetch((text, color), lambda: font.render(text, True, color))
+    ...
+    sugargame.cache.set_budget(8 << 20)
+    print(sugargame.cache.get_stats())
+"""
+
+import itertools
+from collections import OrderedDict
+
+DEFAULT_BUDGET = 16 << 20
+
+
+def surface_bytes(surface):
+    """Return the memory used by a pygame Surface's pixels."""
+    return surface.get_pitch() * surface.get_height()
+
+
+class Cache(object):
+    """LRU cache whose entries are sized in bytes by get_size(value)."""
+
+    def __init__(self, name, registry, get_size=surface_bytes):
+        self.name = name
+        self._registry = registry
+        self._get_size = get_size
+        self._entries = OrderedDict()  # key -> [value, bytes, stamp]
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        entry[2] = self._registry.stamp()
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size=None):
+        if size is None:
+            size = self._get_size(value)
+        self.discard(key)
+        self._entries[key] = [value, size, self._registry.stamp()]
+        self.bytes += size
+        self._registry.trim()
+        return value
+
+    def fetch(self, key, create):
+        """Return the cached value for key, calling create() on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            entry[2] = self._registry.stamp()
+            self._entries.move_to_end(key)
+            return entry[0]
+        self.misses += 1
+        return self.put(key, create())
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def oldest(self):
+        """Return the last-use stamp of the least recently used entry."""
+        for entry in self._entries.values():
+            return entry[2]
+        return None
+
+    def evict_oldest(self):
+        _, entry = self._entries.popitem(last=False)
+        self.bytes -= entry[1]
+        self.evictions += 1
+
+    def get_stats(self):
+        return {'entries': len(self._entries), 'bytes': self.bytes,
+                'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions}
+
+
+class CacheRegistry(object):
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self._caches = {}
+        self._clock = itertools.count()
+
+    def stamp(self):
+        return next(self._clock)
+
+    def get_cache(self, name, get_size=surface_bytes):
+        """Return the cache called name, creating and registering it."""
+        cache = self._caches.get(name)
+        if cache is None:
+            cache = self._caches[name] = Cache(name, self, get_size)
+        return cache
+
+    def total_bytes(self):
+        return sum(cache.bytes for cache in self._caches.values())
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self.trim()
+
+    def trim(self):
+        """Evict least recently used entries until within budget."""
+        total = self.total_bytes()
+        while total > self.budget:
+            candidates = [c for c in self._caches.values() if len(c)]
+            if not candidates:
+                break
+            cache = min(candidates, key=Cache.oldest)
+            before = cache.bytes
+            cache.evict_oldest()
+            total -= before - cache.bytes
+
+    def get_stats(self):
+        stats = dict((name, cache.get_stats())
+                     for name, cache in self._caches.items())
+        return {'budget': self.budget, 'bytes': self.total_bytes(),
+                'caches': stats}
+
+
+registry = CacheRegistry()
+
+
+def get_cache(name, get_size=surface_bytes):
+    return registry.get_cache(name, get_size)
+
+
+def set_budget(budget):
+    registry.set_budget(budget)
+
+
+def get_stats():
+    return registry.get_stats()
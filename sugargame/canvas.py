@@ -20,43 +20,163 @@
 # SOFTWARE.
 #
 
+import logging
 import os
+import struct
+import time
+import zlib
+from collections import deque
 from gi.repository import Gtk
 from gi.repository import GLib
-from sugar3.activity.activity import PREVIEW_SIZE
-import pygame
-import sugargame.event as event
+
+# pygame, sugar3 and the event translator are imported when a canvas is
+# created rather than on import, so importing this module stays cheap.
 
 CANVAS = None
 
+# The pygame.display functions as they were before any canvas hooked them.
+_PYGAME_DISPLAY = None
+
+# Snapshots kept for the most recently saved Journal entries.
+SNAPSHOTS_KEPT = 4
+
+
+class FrameStats(object):
+    """
+    Rolling record of the time frames take to reach the screen: time
+    spent in pygame.display.flip/update, and time spent painting them
+    in a draw handler.  The 'socket' backend does all its work in flip;
+    the 'cairo' backend mostly paints later, so only the sum of the two
+    compares the backends.
+    """
+
+    def __init__(self, samples=120):
+        self._presents = deque(maxlen=samples)  # (time, present_s)
+        self._paints = deque(maxlen=samples)  # (time, paint_s)
+
+    def add(self, seconds):
+        self._presents.append((time.perf_counter(), seconds))
+
+    def add_paint(self, seconds):
+        self._paints.append((time.perf_counter(), seconds))
+
+    def timed(self, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(time.perf_counter() - start)
+        return wrapper
+
+    def get(self):
+        """
+        Return the number of recent frames, mean and maximum present
+        time, mean paint time per frame, and their sum, frame_ms, in
+        milliseconds.
+        """
+        if not self._presents:
+            return {'frames': 0, 'mean_ms': 0.0, 'max_ms': 0.0,
+                    'paint_ms': 0.0, 'frame_ms': 0.0}
+        frames = len(self._presents)
+        presents = [seconds for _, seconds in self._presents]
+        # Paints since the oldest recorded present belong to these frames.
+        since = self._presents[0][0]
+        paints = sum(s for t, s in self._paints if t >= since)
+        mean = sum(presents) / frames
+        return {'frames': frames,
+                'mean_ms': mean * 1000,
+                'max_ms': max(presents) * 1000,
+                'paint_ms': paints / frames * 1000,
+                'frame_ms': (mean + paints / frames) * 1000}
+
 
 class PygameCanvas(Gtk.EventBox):
-    def __init__(self, activity, main=None, modules=[pygame]):
+    """Gtk widget hosting a Pygame display.
+
+    backend selects how Pygame output reaches the screen:
+        'socket'  SDL draws into an X window embedded with Gtk.Socket
+                  (X11 only).
+        'cairo'   Pygame draws offscreen and the canvas paints the
+                  pixels in a Gtk.DrawingArea; no X window is shared
+                  with SDL, so it also runs under Wayland and Xvfb.
+
+    Either way there can be only one canvas per process, ever.
+
+    With repaint_exposed, areas uncovered on screen are repainted from
+    the last presented frame by the canvas itself, and the game gets no
+    VIDEOEXPOSE events.  Otherwise VIDEOEXPOSE events list the exposed
+    areas in their rects attribute.  The 'cairo' backend always
+    repaints from its retained frame.
+
+    depth asks for the display's bits per pixel with the 'socket'
+    backend, e.g. 16 to halve memory bandwidth on XO-1 hardware; 0 lets
+    SDL choose.  SDL 2 (Pygame 2) usually keeps the window's own depth
+    whatever is asked, so a warning is logged when the display comes
+    out different.  The 'cairo' backend always uses 32 bits.
+    """
+
+    def __init__(self, activity, main=None, modules=None, backend='socket',
+                 depth=0, repaint_exposed=False):
         Gtk.EventBox.__init__(self)
 
+        if backend not in ('socket', 'cairo'):
+            raise ValueError('Unknown PygameCanvas backend %r' % backend)
+        if backend == 'cairo' and depth not in (0, 32):
+            raise ValueError('The cairo backend only supports depth 32')
+
+        # Either backend hooks the module-wide pygame.display functions,
+        # so a second canvas would take them over from the first.
         global CANVAS
         assert CANVAS is None, "Only one PygameCanvas can be created, ever."
         CANVAS = self
 
+        import pygame
+        import sugargame.event as event
+        import sugargame.font
+
+        # Remember resolved system fonts across launches.
+        sugargame.font.set_cache_dir(
+            os.path.join(activity.get_activity_root(), 'data'))
+
         # Initialize Events translator before widget gets "realized".
         self.translator = event.Translator(activity, self)
 
         self._activity = activity
         self._main = main
-        self._modules = modules
+        self._modules = modules if modules is not None else [pygame]
+        self._backend = backend
+        self._depth = depth
+        self._depth_logged = False
+        self._repaint_exposed = repaint_exposed or backend == 'cairo'
+        self._stats = FrameStats()
+        self._presents = 0
+        self._recorder = None
 
         self.set_can_focus(True)
 
-        self._socket = Gtk.Socket()
-        self._socket.connect('realize', self._realize_cb)
-        self.add(self._socket)
+        if backend == 'socket':
+            self._widget = Gtk.Socket()
+            self._widget.connect('draw', self.translator.draw_cb)
+        else:
+            from sugargame.offscreen import OffscreenDisplay
+            self._widget = Gtk.DrawingArea()
+            self._display = OffscreenDisplay(self._widget, self._stats)
+            self._widget.connect('draw', self._display.draw_cb)
+        self._widget.connect('realize', self._realize_cb)
+        self.add(self._widget)
 
         self.show_all()
 
     def _realize_cb(self, widget):
+        import pygame
 
-        # Preinitialize Pygame with the X window ID.
-        os.environ['SDL_WINDOWID'] = str(widget.get_id())
+        if self._backend == 'socket':
+            # Preinitialize Pygame with the X window ID.
+            os.environ['SDL_WINDOWID'] = str(widget.get_id())
+        else:
+            # SDL needs no window of its own; the canvas paints the pixels.
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
 
         # Initialize Pygame
         for module in self._modules:
@@ -76,11 +196,36 @@ class PygameCanvas(Gtk.EventBox):
         # Restore the default cursor.
         widget.props.window.set_cursor(None)
 
+        # Hook the original functions again, so realizing the canvas a
+        # second time does not stack wrappers.
+        self._unhook_display()
+
+        if self._backend == 'socket':
+            # Keep the chosen depth when the game calls set_mode itself.
+            pygame.display.set_mode = self._with_depth(pygame.display.set_mode)
+        else:
+            self._display.hook_pygame()
+
+        # Time presents on both backends so they can be compared.
+        pygame.display.flip = self._stats.timed(pygame.display.flip)
+        pygame.display.update = self._stats.timed(pygame.display.update)
+
+        if self._repaint_exposed:
+            self.translator.set_repaint(
+                self._repaint_cb(pygame.display.update))
+
+        # Count presents, so get_preview can tell the screen is unchanged.
+        pygame.display.flip = self._counted(pygame.display.flip)
+        pygame.display.update = self._counted(pygame.display.update)
+
         # Confine the Pygame surface to the canvas size
         r = self.get_allocation()
         self._screen = pygame.display.set_mode((r.width, r.height),
                                                pygame.RESIZABLE)
 
+        # Show the frame saved with the Journal entry while the game starts.
+        self._paint_snapshot()
+
         # Hook certain Pygame functions with GTK equivalents.
         self.translator.hook_pygame()
 
@@ -88,8 +233,151 @@ class PygameCanvas(Gtk.EventBox):
         if self._main:
             GLib.idle_add(self._main)
 
+    def _unhook_display(self):
+        import pygame
+
+        global _PYGAME_DISPLAY
+        if _PYGAME_DISPLAY is None:
+            _PYGAME_DISPLAY = dict(
+                (name, getattr(pygame.display, name))
+                for name in ('set_mode', 'get_surface', 'flip', 'update'))
+        for name, func in _PYGAME_DISPLAY.items():
+            setattr(pygame.display, name, func)
+
+    def _repaint_cb(self, update):
+        # The display surface still holds the last frame: present the
+        # exposed parts of it again without involving the game.
+        def repaint(rects):
+            if rects is None:
+                update()
+            else:
+                update(rects)
+        return repaint
+
+    def _with_depth(self, set_mode):
+        def wrapper(size=(0, 0), flags=0, depth=0, *args, **kwargs):
+            depth = depth or self._depth
+            screen = set_mode(size, flags, depth, *args, **kwargs)
+            # SDL2 takes the depth as a hint at most; say what we got.
+            if depth and screen.get_bitsize() != depth and \
+                    not self._depth_logged:
+                logging.warning('Asked for a %d-bit display, got %d bits'
+                                % (depth, screen.get_bitsize()))
+                self._depth_logged = True
+            return screen
+        return wrapper
+
+    def _counted(self, func):
+        import pygame
+
+        def wrapper(*args, **kwargs):
+            self._presents += 1
+            result = func(*args, **kwargs)
+            if self._recorder is not None:
+                # flip() and update() with no arguments present it all.
+                rects = args[0] if args else None
+                self._recorder.capture(pygame.display.get_surface(), rects)
+            return result
+        return wrapper
+
+    def start_capture(self, directory, max_queue=8):
+        """
+        Record every changed frame to a PNG sequence in directory.
+        Encoding runs on a worker thread; when it falls behind, frames
+        are dropped rather than slowing the game.
+        """
+        from sugargame.capture import Recorder
+        self.stop_capture()
+        self._recorder = Recorder(directory, max_queue)
+
+    def stop_capture(self):
+        """
+        Stop recording and return counts of frames captured, skipped as
+        unchanged, dropped and written, or None if not recording.
+        """
+        if self._recorder is None:
+            return None
+        recorder, self._recorder = self._recorder, None
+        return recorder.stop()
+
     def get_pygame_widget(self):
-        return self._socket
+        return self._widget
+
+    def get_frame_stats(self):
+        """
+        Return the number of recent frames, their mean and maximum time
+        in pygame.display.flip/update (mean_ms, max_ms), the mean time
+        per frame spent painting in the draw handler ('cairo' backend
+        only; paint_ms) and their sum (frame_ms) in milliseconds.
+        Compare backends by frame_ms.
+        """
+        return self._stats.get()
+
+    def _snapshot_dir(self):
+        return os.path.join(self._activity.get_activity_root(), 'data')
+
+    def _snapshot_path(self):
+        return os.path.join(self._snapshot_dir(),
+                            'snapshot-%s' % self._activity.get_id())
+
+    def save_snapshot(self):
+        """
+        Save the last presented frame, compressed, for this Journal entry.
+        Call it from the activity's write_file; on resume the frame is
+        shown as soon as the canvas appears, until the game draws.  Only
+        the SNAPSHOTS_KEPT most recently saved entries keep a snapshot.
+        Failing to save one is logged, so the Journal save goes ahead.
+        """
+        if not hasattr(self, '_screen'):
+            return
+
+        import pygame
+
+        screen = pygame.display.get_surface()
+        if screen is None:
+            return
+        data = zlib.compress(pygame.image.tobytes(screen, 'RGB'), 1)
+        path = self._snapshot_path()
+        try:
+            with open(path + '.tmp', 'wb') as f:
+                f.write(struct.pack('<II', *screen.get_size()))
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logging.error('Cannot save snapshot: %s' % e)
+            return
+        self._prune_snapshots()
+
+    def _prune_snapshots(self):
+        directory = self._snapshot_dir()
+        try:
+            snapshots = []
+            for name in os.listdir(directory):
+                if name.startswith('snapshot-'):
+                    path = os.path.join(directory, name)
+                    snapshots.append((os.stat(path).st_mtime, path))
+            snapshots.sort(reverse=True)
+            for _, path in snapshots[SNAPSHOTS_KEPT:]:
+                os.remove(path)
+        except OSError as e:
+            logging.error('Cannot remove old snapshots: %s' % e)
+
+    def _paint_snapshot(self):
+        import pygame
+
+        try:
+            with open(self._snapshot_path(), 'rb') as f:
+                size = struct.unpack('<II', f.read(8))
+                data = zlib.decompress(f.read())
+            snapshot = pygame.image.frombytes(data, size, 'RGB')
+        except (OSError, struct.error, zlib.error, ValueError):
+            return
+
+        screen = pygame.display.get_surface()
+        if snapshot.get_size() != screen.get_size():
+            snapshot = pygame.transform.scale(snapshot, screen.get_size())
+        screen.blit(snapshot, (0, 0))
+        pygame.display.flip()
 
     def get_preview(self):
         """
@@ -102,18 +390,35 @@ class PygameCanvas(Gtk.EventBox):
         if not hasattr(self, '_screen'):
             return None
 
+        import pygame
+        from sugar3.activity.activity import PREVIEW_SIZE
+        import sugargame.cache
+        import sugargame.surfacepool
+
+        # Reuse the last preview while nothing new has been presented.
+        previews = sugargame.cache.get_cache('preview', get_size=len)
+        key = (self._presents, PREVIEW_SIZE)
+        preview = previews.get(key)
+        if preview is not None:
+            return preview
+
         _tmp_dir = os.path.join(self._activity.get_activity_root(),
                                 'tmp')
         _file_path = os.path.join(_tmp_dir, 'preview.png')
 
         width = PREVIEW_SIZE[0]
         height = PREVIEW_SIZE[1]
-        _surface = pygame.transform.scale(self._screen, (width, height))
-        pygame.image.save(_surface, _file_path)
+        # The game may have replaced the display surface on resize.
+        screen = pygame.display.get_surface()
+        with sugargame.surfacepool.scratch(
+                (width, height), 0, screen.get_bitsize()) as _surface:
+            pygame.transform.scale(screen, (width, height), _surface)
+            pygame.image.save(_surface, _file_path)
 
         f = open(_file_path, 'rb')
         preview = f.read()
         f.close()
         os.remove(_file_path)
 
-        return preview
+        previews.clear()
+        return previews.put(key, preview)
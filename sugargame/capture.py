@@ -0,0 +1,131 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Session capture to a PNG sequence.
+
+The game thread only takes a plain copy of each presented frame and puts
+it in a bounded queue; conversion, change detection and PNG encoding
+happen on a worker thread.  Presents whose update rectangles are all
+empty are ignored without a copy, frames identical to the previous one
+are skipped, and if the encoder falls behind new frames are dropped
+rather than making the game wait.  frames.txt lists each file with its
+time in milliseconds from the start, enough to assemble a video later.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+
+import pygame
+
+_STOP = object()
+
+
+def _changes(rects):
+    """Return whether rects, as given to pygame.display.update, has area."""
+    try:
+        rects = [pygame.Rect(rects)]
+    except TypeError:
+        pass
+    for rect in rects:
+        if rect is not None:
+            rect = pygame.Rect(rect)
+            if rect.width > 0 and rect.height > 0:
+                return True
+    return False
+
+
+class Recorder(object):
+    def __init__(self, directory, max_queue=8):
+        self.directory = directory
+        self.captured = 0  # frames queued, by the game thread
+        self.dropped = 0
+        self.skipped = 0  # unchanged frames, by the worker
+        self.written = 0
+        self._start = time.monotonic()
+        self._last_crc = None
+        self._queue = queue.Queue(max_queue)
+        os.makedirs(directory, exist_ok=True)
+        self._index = open(os.path.join(directory, 'frames.txt'), 'w')
+        self._thread = threading.Thread(target=self._encode,
+                                        name='sugargame-capture', daemon=True)
+        self._thread.start()
+
+    def capture(self, surface, rects=None):
+        """
+        Queue a copy of surface, unless the queue is full.  rects is what
+        the game passed to pygame.display.update, or None for the whole
+        display; a present that changes no area is not a new frame.
+        """
+        if surface is None:
+            return
+        if rects is not None and not _changes(rects):
+            return
+        if self._queue.full():
+            # Don't pay for the copy when the frame would be dropped.
+            self.dropped += 1
+            return
+        # A same-format copy is a plain memory copy; converting it to RGB
+        # and comparing it with the last frame is left to the worker.
+        ms = int((time.monotonic() - self._start) * 1000)
+        try:
+            self._queue.put_nowait((ms, surface.copy()))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.captured += 1
+
+    def _encode(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            ms, frame = item
+            data = pygame.image.tobytes(frame, 'RGB')
+            crc = zlib.crc32(data)
+            if crc == self._last_crc:
+                self.skipped += 1
+                continue
+            self._last_crc = crc
+            name = 'frame-%06d.png' % self.written
+            try:
+                pygame.image.save(frame, os.path.join(self.directory, name))
+            except (pygame.error, OSError) as e:
+                logging.error('Cannot write capture frame: %s' % e)
+                continue
+            self._index.write('%s %d\n' % (name, ms))
+            self.written += 1
+        self._index.close()
+
+    def stop(self):
+        """Finish writing queued frames and return the capture stats."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        return self.get_stats()
+
+    def get_stats(self):
+        return {'captured': self.captured, 'skipped': self.skipped,
+                'dropped': self.dropped, 'written': self.written}
@@ -25,6 +25,7 @@ from gi.repository import GLib
 from gi.repository import Gdk
 import pygame
 import pygame.event
+import sugargame.eventqueue as eventqueue
 
 
 class _MockEvent(object):
@@ -32,174 +33,197 @@ class _MockEvent(object):
         self.keyval = keyval
 
 
+class _lazy_table(object):
+    """Class attribute built on first access, then cached on the class.
+
+    Keeps the key tables below from being built when the module is merely
+    imported.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._name = build.__name__
+
+    def __get__(self, obj, cls):
+        value = self._build()
+        setattr(cls, self._name, value)
+        return value
+
+
 class Translator(object):
-    key_trans = {
-        'Alt_L': pygame.K_LALT,
-        'Alt_R': pygame.K_RALT,
-        'Control_L': pygame.K_LCTRL,
-        'Control_R': pygame.K_RCTRL,
-        'Shift_L': pygame.K_LSHIFT,
-        'Shift_R': pygame.K_RSHIFT,
-        'Super_L': pygame.K_LSUPER,
-        'Super_R': pygame.K_RSUPER,
-        'KP_Page_Up': pygame.K_KP9,
-        'KP_Page_Down': pygame.K_KP3,
-        'KP_End': pygame.K_KP1,
-        'KP_Home': pygame.K_KP7,
-        'KP_Up': pygame.K_KP8,
-        'KP_Down': pygame.K_KP2,
-        'KP_Left': pygame.K_KP4,
-        'KP_Right': pygame.K_KP6,
-        'KP_Next': pygame.K_KP3,
-        'KP_Begin': pygame.K_KP5,
-
-    }
-
-    mod_map = {
-        pygame.K_LALT: pygame.KMOD_LALT,
-        pygame.K_RALT: pygame.KMOD_RALT,
-        pygame.K_LCTRL: pygame.KMOD_LCTRL,
-        pygame.K_RCTRL: pygame.KMOD_RCTRL,
-        pygame.K_LSHIFT: pygame.KMOD_LSHIFT,
-        pygame.K_RSHIFT: pygame.KMOD_RSHIFT,
-    }
-
-    keys = [
-        pygame.K_UNKNOWN,
-        pygame.K_BACKSPACE,
-        pygame.K_TAB,
-        pygame.K_RETURN,
-        pygame.K_ESCAPE,
-        pygame.K_SPACE,
-        pygame.K_EXCLAIM,
-        pygame.K_QUOTEDBL,
-        pygame.K_HASH,
-        pygame.K_DOLLAR,
-        pygame.K_PERCENT,
-        pygame.K_AMPERSAND,
-        pygame.K_QUOTE,
-        pygame.K_LEFTPAREN,
-        pygame.K_RIGHTPAREN,
-        pygame.K_ASTERISK,
-        pygame.K_PLUS,
-        pygame.K_COMMA,
-        pygame.K_MINUS,
-        pygame.K_PERIOD,
-        pygame.K_SLASH,
-        pygame.K_0,
-        pygame.K_1,
-        pygame.K_2,
-        pygame.K_3,
-        pygame.K_4,
-        pygame.K_5,
-        pygame.K_6,
-        pygame.K_7,
-        pygame.K_8,
-        pygame.K_9,
-        pygame.K_COLON,
-        pygame.K_SEMICOLON,
-        pygame.K_LESS,
-        pygame.K_EQUALS,
-        pygame.K_GREATER,
-        pygame.K_QUESTION,
-        pygame.K_AT,
-        pygame.K_LEFTBRACKET,
-        pygame.K_BACKSLASH,
-        pygame.K_RIGHTBRACKET,
-        pygame.K_CARET,
-        pygame.K_UNDERSCORE,
-        pygame.K_BACKQUOTE,
-        pygame.K_a,
-        pygame.K_b,
-        pygame.K_c,
-        pygame.K_d,
-        pygame.K_e,
-        pygame.K_f,
-        pygame.K_g,
-        pygame.K_h,
-        pygame.K_i,
-        pygame.K_j,
-        pygame.K_k,
-        pygame.K_l,
-        pygame.K_m,
-        pygame.K_n,
-        pygame.K_o,
-        pygame.K_p,
-        pygame.K_q,
-        pygame.K_r,
-        pygame.K_s,
-        pygame.K_t,
-        pygame.K_u,
-        pygame.K_v,
-        pygame.K_w,
-        pygame.K_x,
-        pygame.K_y,
-        pygame.K_z,
-        pygame.K_DELETE,
-        pygame.K_CAPSLOCK,
-        pygame.K_F1,
-        pygame.K_F2,
-        pygame.K_F3,
-        pygame.K_F4,
-        pygame.K_F5,
-        pygame.K_F6,
-        pygame.K_F7,
-        pygame.K_F8,
-        pygame.K_F9,
-        pygame.K_F10,
-        pygame.K_F11,
-        pygame.K_F12,
-        pygame.K_PRINT,
-        pygame.K_SCROLLOCK,
-        pygame.K_BREAK,
-        pygame.K_INSERT,
-        pygame.K_HOME,
-        pygame.K_PAGEUP,
-        pygame.K_END,
-        pygame.K_PAGEDOWN,
-        pygame.K_RIGHT,
-        pygame.K_LEFT,
-        pygame.K_DOWN,
-        pygame.K_UP,
-        pygame.K_NUMLOCK,
-        pygame.K_KP_DIVIDE,
-        pygame.K_KP_MULTIPLY,
-        pygame.K_KP_MINUS,
-        pygame.K_KP_PLUS,
-        pygame.K_KP_ENTER,
-        pygame.K_KP1,
-        pygame.K_KP2,
-        pygame.K_KP3,
-        pygame.K_KP4,
-        pygame.K_KP5,
-        pygame.K_KP6,
-        pygame.K_KP7,
-        pygame.K_KP8,
-        pygame.K_KP9,
-        pygame.K_KP0,
-        pygame.K_KP_PERIOD,
-        pygame.K_POWER,
-        pygame.K_KP_EQUALS,
-        pygame.K_F13,
-        pygame.K_F14,
-        pygame.K_F15,
-        pygame.K_HELP,
-        pygame.K_MENU,
-        pygame.K_SYSREQ,
-        pygame.K_CLEAR,
-        pygame.K_CURRENCYUNIT,
-        pygame.K_CURRENCYSUBUNIT,
-        pygame.K_LCTRL,
-        pygame.K_LSHIFT,
-        pygame.K_LALT,
-        pygame.K_LMETA,
-        pygame.K_RCTRL,
-        pygame.K_RSHIFT,
-        pygame.K_RALT,
-        pygame.K_RMETA,
-        pygame.K_MODE,
-        pygame.K_AC_BACK
-    ]
+    @_lazy_table
+    def key_trans():
+        return {
+            'Alt_L': pygame.K_LALT,
+            'Alt_R': pygame.K_RALT,
+            'Control_L': pygame.K_LCTRL,
+            'Control_R': pygame.K_RCTRL,
+            'Shift_L': pygame.K_LSHIFT,
+            'Shift_R': pygame.K_RSHIFT,
+            'Super_L': pygame.K_LSUPER,
+            'Super_R': pygame.K_RSUPER,
+            'KP_Page_Up': pygame.K_KP9,
+            'KP_Page_Down': pygame.K_KP3,
+            'KP_End': pygame.K_KP1,
+            'KP_Home': pygame.K_KP7,
+            'KP_Up': pygame.K_KP8,
+            'KP_Down': pygame.K_KP2,
+            'KP_Left': pygame.K_KP4,
+            'KP_Right': pygame.K_KP6,
+            'KP_Next': pygame.K_KP3,
+            'KP_Begin': pygame.K_KP5,
+
+        }
+
+    @_lazy_table
+    def mod_map():
+        return {
+            pygame.K_LALT: pygame.KMOD_LALT,
+            pygame.K_RALT: pygame.KMOD_RALT,
+            pygame.K_LCTRL: pygame.KMOD_LCTRL,
+            pygame.K_RCTRL: pygame.KMOD_RCTRL,
+            pygame.K_LSHIFT: pygame.KMOD_LSHIFT,
+            pygame.K_RSHIFT: pygame.KMOD_RSHIFT,
+        }
+
+    @_lazy_table
+    def keys():
+        return [
+            pygame.K_UNKNOWN,
+            pygame.K_BACKSPACE,
+            pygame.K_TAB,
+            pygame.K_RETURN,
+            pygame.K_ESCAPE,
+            pygame.K_SPACE,
+            pygame.K_EXCLAIM,
+            pygame.K_QUOTEDBL,
+            pygame.K_HASH,
+            pygame.K_DOLLAR,
+            pygame.K_PERCENT,
+            pygame.K_AMPERSAND,
+            pygame.K_QUOTE,
+            pygame.K_LEFTPAREN,
+            pygame.K_RIGHTPAREN,
+            pygame.K_ASTERISK,
+            pygame.K_PLUS,
+            pygame.K_COMMA,
+            pygame.K_MINUS,
+            pygame.K_PERIOD,
+            pygame.K_SLASH,
+            pygame.K_0,
+            pygame.K_1,
+            pygame.K_2,
+            pygame.K_3,
+            pygame.K_4,
+            pygame.K_5,
+            pygame.K_6,
+            pygame.K_7,
+            pygame.K_8,
+            pygame.K_9,
+            pygame.K_COLON,
+            pygame.K_SEMICOLON,
+            pygame.K_LESS,
+            pygame.K_EQUALS,
+            pygame.K_GREATER,
+            pygame.K_QUESTION,
+            pygame.K_AT,
+            pygame.K_LEFTBRACKET,
+            pygame.K_BACKSLASH,
+            pygame.K_RIGHTBRACKET,
+            pygame.K_CARET,
+            pygame.K_UNDERSCORE,
+            pygame.K_BACKQUOTE,
+            pygame.K_a,
+            pygame.K_b,
+            pygame.K_c,
+            pygame.K_d,
+            pygame.K_e,
+            pygame.K_f,
+            pygame.K_g,
+            pygame.K_h,
+            pygame.K_i,
+            pygame.K_j,
+            pygame.K_k,
+            pygame.K_l,
+            pygame.K_m,
+            pygame.K_n,
+            pygame.K_o,
+            pygame.K_p,
+            pygame.K_q,
+            pygame.K_r,
+            pygame.K_s,
+            pygame.K_t,
+            pygame.K_u,
+            pygame.K_v,
+            pygame.K_w,
+            pygame.K_x,
+            pygame.K_y,
+            pygame.K_z,
+            pygame.K_DELETE,
+            pygame.K_CAPSLOCK,
+            pygame.K_F1,
+            pygame.K_F2,
+            pygame.K_F3,
+            pygame.K_F4,
+            pygame.K_F5,
+            pygame.K_F6,
+            pygame.K_F7,
+            pygame.K_F8,
+            pygame.K_F9,
+            pygame.K_F10,
+            pygame.K_F11,
+            pygame.K_F12,
+            pygame.K_PRINT,
+            pygame.K_SCROLLOCK,
+            pygame.K_BREAK,
+            pygame.K_INSERT,
+            pygame.K_HOME,
+            pygame.K_PAGEUP,
+            pygame.K_END,
+            pygame.K_PAGEDOWN,
+            pygame.K_RIGHT,
+            pygame.K_LEFT,
+            pygame.K_DOWN,
+            pygame.K_UP,
+            pygame.K_NUMLOCK,
+            pygame.K_KP_DIVIDE,
+            pygame.K_KP_MULTIPLY,
+            pygame.K_KP_MINUS,
+            pygame.K_KP_PLUS,
+            pygame.K_KP_ENTER,
+            pygame.K_KP1,
+            pygame.K_KP2,
+            pygame.K_KP3,
+            pygame.K_KP4,
+            pygame.K_KP5,
+            pygame.K_KP6,
+            pygame.K_KP7,
+            pygame.K_KP8,
+            pygame.K_KP9,
+            pygame.K_KP0,
+            pygame.K_KP_PERIOD,
+            pygame.K_POWER,
+            pygame.K_KP_EQUALS,
+            pygame.K_F13,
+            pygame.K_F14,
+            pygame.K_F15,
+            pygame.K_HELP,
+            pygame.K_MENU,
+            pygame.K_SYSREQ,
+            pygame.K_CLEAR,
+            pygame.K_CURRENCYUNIT,
+            pygame.K_CURRENCYSUBUNIT,
+            pygame.K_LCTRL,
+            pygame.K_LSHIFT,
+            pygame.K_LALT,
+            pygame.K_LMETA,
+            pygame.K_RCTRL,
+            pygame.K_RSHIFT,
+            pygame.K_RALT,
+            pygame.K_RMETA,
+            pygame.K_MODE,
+            pygame.K_AC_BACK
+        ]
 
     def __init__(self, activity, inner_evb):
         """Initialise the Translator with the windows to which to listen"""
@@ -210,8 +234,7 @@ class Translator(object):
         # (add instead of set here because the main window is already realized)
         self._activity.add_events(
             Gdk.EventMask.KEY_PRESS_MASK |
-            Gdk.EventMask.KEY_RELEASE_MASK |
-            Gdk.EventMask.VISIBILITY_NOTIFY_MASK
+            Gdk.EventMask.KEY_RELEASE_MASK
         )
 
         self._inner_evb.set_events(
@@ -227,7 +250,6 @@ class Translator(object):
 
         # Callback functions to link the event systems
         self._activity.connect('unrealize', self._quit_cb)
-        self._activity.connect('visibility-notify-event', self._visibility_cb)
         self._inner_evb.connect('size-allocate', self._resize_cb)
         self._inner_evb.connect('key-press-event', self._keydown_cb)
         self._inner_evb.connect('key-release-event', self._keyup_cb)
@@ -245,6 +267,7 @@ class Translator(object):
         self.__held_last_time = {}
         self.__tick_id = None
         self.__keystate = dict((i, False) for i in self.keys)
+        self.__repaint = None
 
     def hook_pygame(self):
         pygame.key.get_pressed = self._get_pressed
@@ -252,9 +275,37 @@ class Translator(object):
         pygame.mouse.get_pressed = self._get_mouse_pressed
         pygame.mouse.get_pos = self._get_mouse_pos
 
-    def update_display(self):
-        if pygame.display.get_init():
-            pygame.event.post(pygame.event.Event(pygame.VIDEOEXPOSE))
+    def set_repaint(self, repaint):
+        """
+        Have exposed areas repainted by repaint(rects) from the last
+        frame, instead of posting VIDEOEXPOSE for the game to redraw.
+        """
+        self.__repaint = repaint
+
+    def update_display(self, rects=None):
+        """
+        Report exposed areas of the display; rects is a list of
+        pygame.Rect, or None when the whole display was exposed.
+        VIDEOEXPOSE events carry the list as their rects attribute.
+        """
+        if not pygame.display.get_init():
+            return
+        if self.__repaint is not None:
+            self.__repaint(rects)
+            return
+        if rects is None:
+            surface = pygame.display.get_surface()
+            rects = [surface.get_rect()] if surface is not None else []
+        self._post(pygame.event.Event(pygame.VIDEOEXPOSE, rects=rects))
+
+    def draw_cb(self, widget, cr):
+        """Report the area GTK is redrawing as exposed."""
+        rects = [pygame.Rect(int(r.x), int(r.y),
+                             int(r.width + 0.5), int(r.height + 0.5))
+                 for r in cr.copy_clip_rectangle_list()]
+        if rects:
+            self.update_display(rects)
+        return False
 
     def _resize_cb(self, widget, allocation):
         if pygame.display.get_init():
@@ -270,10 +321,6 @@ class Translator(object):
     def _quit_cb(self, data=None):
         pygame.event.post(pygame.event.Event(pygame.QUIT))
 
-    def _visibility_cb(self, widget, event):
-        self.update_display()
-        return False
-
     def _keydown_cb(self, widget, event):
         key = event.keyval
         if key in self.__held:
@@ -407,13 +454,4 @@ class Translator(object):
         return self.__mouse_pos
 
     def _post(self, evt):
-        try:
-            pygame.event.post(evt)
-        except pygame.error as e:
-            if str(e) == 'video system not initialized':
-                pass
-            elif str(e) == 'Event queue full':
-                logging.error("Event queue full!")
-                pass
-            else:
-                raise e
+        eventqueue.post(evt)
@@ -0,0 +1,52 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import logging
+import sys
+
+import pygame
+
+
+def post(evt):
+    """
+    Post evt to the Pygame event queue.  Safe to call from any thread.
+    Returns False if the event was dropped: before Pygame's display is
+    initialized, or when the queue is full.
+    """
+    try:
+        return pygame.event.post(evt) is not False
+    except pygame.error as e:
+        if str(e) == 'video system not initialized':
+            pass
+        elif str(e) == 'Event queue full':
+            logging.error("Event queue full!")
+            pass
+        else:
+            raise e
+    return False
+
+
+def wakeup():
+    """Wake the GLib main loop, if one is in use, from any thread."""
+    GLib = sys.modules.get('gi.repository.GLib')
+    if GLib is not None:
+        GLib.MainContext.default().wakeup()
@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Background tasks whose results arrive as Pygame events.
+
+The game loop stays single threaded: work runs on a thread pool (or a
+process pool, for CPU-bound pure-Python work), and each finished task is
+posted to the Pygame event queue, the same way the GTK event translator
+posts input.  Posting wakes a loop blocked in pygame.event.wait(), and a
+GLib main loop is woken too.
+
+    executor = sugargame.executor.Executor()
+    task = executor.submit(generate_level, 12)
+    ...
+    for event in pygame.event.get():
+        if event.type == executor.event_type and event.task is task:
+            if event.error is None:
+                use(event.result)
+"""
+
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pygame
+
+import sugargame.eventqueue as eventqueue
+
+
+class Task(object):
+    def __init__(self, future, tag=None):
+        self.tag = tag
+        self._future = future
+        self._cancelled = False
+
+    def cancel(self):
+        """Stop the task; if it is already running its result is dropped."""
+        self._cancelled = True
+        self._future.cancel()
+
+    def cancelled(self):
+        return self._cancelled
+
+    def done(self):
+        return self._future.done()
+
+
+class Executor(object):
+    def __init__(self, workers=2, processes=False, max_pending=16,
+                 event_type=None):
+        """
+        workers: number of worker threads or processes
+        processes: use a process pool; the callable and its arguments
+            and result must then be picklable
+        max_pending: tasks allowed queued or running at once
+        event_type: Pygame event type for results; by default a new
+            custom type, available as the event_type attribute
+        """
+        if processes:
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        if event_type is None:
+            event_type = pygame.event.custom_type()
+        self.event_type = event_type
+
+    def submit(self, func, *args, tag=None, block=False, **kwargs):
+        """
+        Run func(*args, **kwargs) in the background and return a Task.
+        When it finishes an event of event_type is posted with task,
+        tag, result and error (the exception, or None) attributes.
+        Raises queue.Full if max_pending tasks are outstanding, unless
+        block is True.
+        """
+        if not self._slots.acquire(blocking=block):
+            raise queue.Full('Too many pending tasks')
+        try:
+            future = self._pool.submit(func, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        task = Task(future, tag)
+        future.add_done_callback(lambda f: self._done(task, f))
+        return task
+
+    def _done(self, task, future):
+        # Runs on a worker or pool management thread.
+        self._slots.release()
+        if task.cancelled() or future.cancelled():
+            return
+        error = future.exception()
+        result = None if error is not None else future.result()
+        eventqueue.post(pygame.event.Event(self.event_type, task=task,
+                                           tag=task.tag, result=result,
+                                           error=error))
+        eventqueue.wakeup()
+
+    def shutdown(self, wait=False):
+        """Stop accepting tasks and drop those not yet started."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
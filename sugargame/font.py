@@ -0,0 +1,163 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+System font loading without the start-up scan.
+
+The first pygame.font.SysFont() call runs fc-list over every installed
+font, which is slow on flash storage, and repeats it on every launch.
+SysFont() here resolves each (name, bold, italic) with pygame once,
+remembers the resulting file in fonts.json in the cache directory, and
+opens that file directly on later launches.  The saved mapping is thrown
+away when the installed fonts or fontconfig setup change.  Font objects
+are also shared within the process per file, size and style.
+
+PygameCanvas sets the cache directory to the activity's data directory;
+other programs can call set_cache_dir().
+
+    font = sugargame.font.SysFont('Nunito', 32, bold=True)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+
+import pygame
+
+CACHE_FILE = 'fonts.json'
+
+# Directories whose modification times change when fonts or fontconfig
+# setup are added or removed.
+_FONT_DIRS = [
+    '/etc/fonts',
+    '/etc/fonts/conf.d',
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    '/var/cache/fontconfig',
+    '~/.fonts',
+    '~/.local/share/fonts',
+    '~/.cache/fontconfig',
+    '~/.config/fontconfig',
+]
+
+
+def fontconfig_state():
+    """Return a fingerprint of the installed fonts and font setup."""
+    h = hashlib.sha1()
+    h.update(('%s %s' % (sys.platform, pygame.version.ver)).encode())
+    for path in _FONT_DIRS:
+        path = os.path.expanduser(path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        h.update(('%s=%s;' % (path, mtime)).encode())
+    return h.hexdigest()
+
+
+def _resolve(path, size, bold, italic):
+    # Used as SysFont's constructor: report its choice, open nothing.
+    return [path, bold, italic]
+
+
+class FontLoader(object):
+    def __init__(self, cache_dir=None):
+        self._cache_dir = cache_dir
+        self._state = None
+        self._resolved = None
+        self._fonts = {}
+
+    def set_cache_dir(self, cache_dir):
+        if cache_dir != self._cache_dir:
+            self._cache_dir = cache_dir
+            self._resolved = None
+
+    def _cache_path(self):
+        return os.path.join(self._cache_dir, CACHE_FILE)
+
+    def _load(self):
+        self._state = fontconfig_state()
+        self._resolved = {}
+        if self._cache_dir is None:
+            return
+        try:
+            with open(self._cache_path()) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get('state') == self._state:
+            self._resolved = saved.get('fonts', {})
+
+    def _save(self):
+        if self._cache_dir is None:
+            return
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            tmp = self._cache_path() + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump({'state': self._state, 'fonts': self._resolved}, f)
+            os.replace(tmp, self._cache_path())
+        except OSError as e:
+            logging.error('Cannot save font cache: %s' % e)
+
+    def resolve(self, name, bold=False, italic=False):
+        """
+        Return (path, fake_bold, fake_italic) as pygame.font.SysFont
+        would choose them; path is None for pygame's default font.
+        """
+        if self._resolved is None:
+            self._load()
+        key = '%s|%d|%d' % (name, bold, italic)
+        entry = self._resolved.get(key)
+        if entry is not None and \
+                (entry[0] is None or os.path.exists(entry[0])):
+            return tuple(entry)
+        entry = pygame.font.SysFont(name, 0, bold, italic,
+                                    constructor=_resolve)
+        self._resolved[key] = entry
+        self._save()
+        return tuple(entry)
+
+    def SysFont(self, name, size, bold=False, italic=False):
+        """Drop-in replacement for pygame.font.SysFont."""
+        path, fake_bold, fake_italic = self.resolve(name, bold, italic)
+        key = (path, size, fake_bold, fake_italic)
+        font = self._fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(path, size)
+            font.set_bold(fake_bold)
+            font.set_italic(fake_italic)
+            self._fonts[key] = font
+        return font
+
+
+loader = FontLoader()
+
+
+def set_cache_dir(cache_dir):
+    loader.set_cache_dir(cache_dir)
+
+
+def SysFont(name, size, bold=False, italic=False):
+    return loader.SysFont(name, size, bold, italic)
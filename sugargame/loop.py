@@ -0,0 +1,117 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Main loop drivers.
+
+FixedStep runs a game's simulation at a fixed rate however fast frames are
+drawn, so motion does not slow down on slow machines, and hands the
+renderer an interpolation factor so frames between steps stay smooth:
+
+    stepper = sugargame.loop.FixedStep(game.update, game.render, rate=30)
+    while running:
+        ...
+        stepper.frame(clock.tick(60))
+
+run_async() drives a per-frame callback from asyncio, yielding to the event
+loop after every frame.  In the browser (pygbag) the yield is what lets the
+page run, and the browser paces frames; natively the frame rate is capped
+with pygame.time.Clock as usual, so the same game code runs in both.
+
+    async def main():
+        await sugargame.loop.run_async(game.frame, fps=60)
+
+    asyncio.run(main())
+"""
+
+import asyncio
+import sys
+
+import pygame
+
+IN_BROWSER = sys.platform == 'emscripten'
+
+
+async def run_async(frame, fps=60):
+    """Call frame(dt) once per frame until it returns False.
+
+    dt is the time in milliseconds since the previous frame.
+    """
+    clock = pygame.time.Clock()
+    # The browser schedules frames itself; only cap the rate natively.
+    framerate = 0 if IN_BROWSER else fps
+    clock.tick()
+    while True:
+        await asyncio.sleep(0)
+        if frame(clock.tick(framerate)) is False:
+            break
+
+
+class FixedStep(object):
+    """
+    Calls update(dt) at a fixed rate and render(alpha) once per frame.
+
+    dt is the step length in seconds.  alpha, from 0 to 1, is how far the
+    current time lies between the last two steps; draw positions as
+    previous + (current - previous) * alpha.  At most max_steps updates
+    run per frame: after a long stall the remaining time is dropped
+    rather than simulated, so a slow machine cannot fall ever further
+    behind.
+    """
+
+    def __init__(self, update, render, rate=30, max_steps=5):
+        self._update = update
+        self._render = render
+        self.step = 1.0 / rate
+        self.max_steps = max_steps
+        self._lag = 0.0
+        # Running totals, for diagnostics.
+        self.steps = 0
+        self.caught_up = 0
+        self.skipped = 0
+
+    def reset(self):
+        """Forget accumulated time, e.g. after unpausing."""
+        self._lag = 0.0
+
+    def frame(self, elapsed):
+        """Advance by elapsed milliseconds, then render; return alpha."""
+        self._lag += elapsed / 1000.0
+        steps = 0
+        while self._lag >= self.step and steps < self.max_steps:
+            self._update(self.step)
+            self._lag -= self.step
+            steps += 1
+        if steps > 1:
+            self.caught_up += steps - 1
+        if self._lag >= self.step:
+            dropped = int(self._lag // self.step)
+            self.skipped += dropped
+            self._lag -= dropped * self.step
+        self.steps += steps
+        alpha = self._lag / self.step
+        self._render(alpha)
+        return alpha
+
+    def get_stats(self):
+        return {'steps': self.steps, 'caught_up': self.caught_up,
+                'skipped': self.skipped}
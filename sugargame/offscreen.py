@@ -0,0 +1,119 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Offscreen display for the 'cairo' PygameCanvas backend.
+
+pygame draws into a Surface whose pixels live in a bytearray that is also
+wrapped, without copying, as a cairo ImageSurface.  The widget's draw
+handler paints that ImageSurface; pygame.display.update() only queues the
+updated rectangles for repaint.  No X window is shared with SDL, so this
+works under Wayland, Xvfb or with SDL's dummy video driver.
+"""
+
+import sys
+import time
+
+import cairo
+import pygame
+
+# Byte order of cairo's native-endian 32-bit RGB24 pixels, as pygame names it.
+_PYGAME_FORMAT = 'BGRA' if sys.byteorder == 'little' else 'ARGB'
+
+
+class OffscreenDisplay(object):
+    def __init__(self, widget, stats=None):
+        self._widget = widget
+        self._stats = stats
+        self._buffer = None
+        self._surface = None
+        self._image = None
+
+    def hook_pygame(self):
+        # A real (hidden, 1x1) video mode, so Surface.convert() and
+        # convert_alpha() work as games expect.
+        pygame.display.set_mode((1, 1), getattr(pygame, 'HIDDEN', 0))
+        pygame.display.set_mode = self.set_mode
+        pygame.display.get_surface = self.get_surface
+        pygame.display.flip = self.flip
+        pygame.display.update = self.update
+
+    def set_mode(self, size=(0, 0), flags=0, *args, **kwargs):
+        width, height = size
+        if width <= 0 or height <= 0:
+            r = self._widget.get_allocation()
+            width, height = r.width, r.height
+        if self._surface is not None and \
+                self._surface.get_size() == (width, height):
+            return self._surface
+
+        stride = cairo.ImageSurface.format_stride_for_width(
+            cairo.FORMAT_RGB24, width)
+        assert stride == width * 4
+        # One buffer, two views: pygame draws into it, cairo paints from it.
+        self._buffer = bytearray(stride * height)
+        self._surface = pygame.image.frombuffer(self._buffer,
+                                                (width, height),
+                                                _PYGAME_FORMAT)
+        self._image = cairo.ImageSurface.create_for_data(
+            self._buffer, cairo.FORMAT_RGB24, width, height, stride)
+        self._widget.queue_draw()
+        return self._surface
+
+    def get_surface(self):
+        return self._surface
+
+    def flip(self):
+        if self._image is None:
+            return
+        self._image.mark_dirty()
+        self._widget.queue_draw()
+
+    def update(self, rectangle=None):
+        if self._image is None:
+            return
+        if rectangle is None:
+            self.flip()
+            return
+        try:
+            rectangles = [pygame.Rect(rectangle)]
+        except TypeError:
+            rectangles = rectangle
+        bounds = self._surface.get_rect()
+        for rect in rectangles:
+            if rect is None:
+                continue
+            rect = bounds.clip(pygame.Rect(rect))
+            if rect.width and rect.height:
+                self._image.mark_dirty_rectangle(*rect)
+                self._widget.queue_draw_area(*rect)
+
+    def draw_cb(self, widget, cr):
+        if self._image is None:
+            return False
+        start = time.perf_counter()
+        # GTK has already clipped cr to the damaged region.
+        cr.set_source_surface(self._image, 0, 0)
+        cr.paint()
+        if self._stats is not None:
+            self._stats.add_paint(time.perf_counter() - start)
+        return False
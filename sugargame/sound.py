@@ -0,0 +1,187 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Sound manager.
+
+Decodes sound files on a worker thread so the game loop never waits on
+disk or the decoder, keeps decoded sounds in an LRU cache bounded in
+bytes, and shares a fixed pool of mixer channels between them, stealing
+the lowest-priority voice when all channels are busy.  Works unchanged
+with SDL_AUDIODRIVER=dummy, which PygameCanvas falls back to when there
+is no sound card.
+
+    sounds = sugargame.sound.SoundManager('sounds', budget=4 << 20)
+    sounds.preload(['click.ogg', 'win.ogg'])
+    ...
+    sounds.play('click.ogg')
+    sounds.play('win.ogg', priority=10)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pygame
+
+
+def sound_bytes(sound):
+    """Return the size of a decoded Sound's sample buffer."""
+    frequency, size, channels = pygame.mixer.get_init()
+    samples = int(round(sound.get_length() * frequency))
+    return samples * channels * abs(size) // 8
+
+
+class SoundManager(object):
+    def __init__(self, path='', budget=8 << 20, channels=8):
+        """
+        path: directory sound names are relative to
+        budget: bytes of decoded audio to keep cached
+        channels: number of mixer channels to share between sounds
+        """
+        self._path = path
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # name -> (Sound, bytes)
+        self._pending = {}  # name -> Future
+        self._failed = set()  # names that could not be loaded
+        self._bytes = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+        pygame.mixer.set_num_channels(channels)
+        self._channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self._voices = [None] * channels  # (priority, start time) per channel
+
+    def _decode(self, name):
+        try:
+            sound = pygame.mixer.Sound(os.path.join(self._path, name))
+        except (pygame.error, FileNotFoundError) as e:
+            logging.error('Cannot load sound %s: %s' % (name, e))
+            sound = None
+        with self._lock:
+            self._pending.pop(name, None)
+            if sound is not None:
+                self._store(name, sound)
+            else:
+                self._failed.add(name)
+        return sound
+
+    def _store(self, name, sound):
+        size = sound_bytes(sound)
+        if name in self._cache:
+            self._bytes -= self._cache.pop(name)[1]
+        self._cache[name] = (sound, size)
+        self._bytes += size
+        # Evict least recently used sounds, but always keep the newest.
+        while self._bytes > self.budget and len(self._cache) > 1:
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._bytes -= evicted
+
+    def load(self, name):
+        """
+        Start decoding name in the background; return a Future.  A name
+        already decoded, or that failed to load, gives a finished Future
+        (of None for a failure) and is not decoded again.
+        """
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry is not None or name in self._failed:
+                future = Future()
+                future.set_result(entry[0] if entry else None)
+                return future
+            if name in self._pending:
+                return self._pending[name]
+            future = self._executor.submit(self._decode, name)
+            self._pending[name] = future
+            return future
+
+    def preload(self, names):
+        for name in names:
+            if self.get(name) is None:
+                self.load(name)
+
+    def get(self, name):
+        """Return the decoded Sound for name, or None if not yet decoded."""
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry is None:
+                return None
+            self._cache.move_to_end(name)
+            return entry[0]
+
+    def wait(self, name):
+        """Block until name is decoded and return its Sound."""
+        sound = self.get(name)
+        if sound is None:
+            # load() rechecks the cache under the lock, so a decode that
+            # finished since get() is reused rather than repeated.
+            sound = self.load(name).result()
+        return sound
+
+    def _pick_channel(self, priority):
+        victim = None
+        for i, channel in enumerate(self._channels):
+            if not channel.get_busy():
+                return i
+            # Busy with something not started here: treat as oldest.
+            voice = self._voices[i] or (priority, 0)
+            # Steal the lowest-priority, then oldest, voice not above ours.
+            if voice[0] <= priority and (victim is None or voice < victim[1]):
+                victim = (i, voice)
+        return victim[0] if victim else None
+
+    def play(self, name, priority=0, loops=0, volume=1.0):
+        """
+        Play name on a pooled channel and return the Channel, or None if
+        the sound is still decoding (decoding is started), could not be
+        loaded, or every channel is busy with a higher-priority sound.
+        """
+        sound = self.get(name)
+        if sound is None:
+            self.load(name)
+            return None
+        i = self._pick_channel(priority)
+        if i is None:
+            return None
+        channel = self._channels[i]
+        channel.stop()
+        channel.set_volume(volume)
+        channel.play(sound, loops=loops)
+        self._voices[i] = (priority, time.monotonic())
+        return channel
+
+    def stop(self):
+        for channel in self._channels:
+            channel.stop()
+
+    def get_stats(self):
+        with self._lock:
+            return {'sounds': len(self._cache), 'bytes': self._bytes,
+                    'pending': len(self._pending),
+                    'failed': len(self._failed), 'budget': self.budget}
+
+    def close(self):
+        self.stop()
+        self._executor.shutdown(wait=False)
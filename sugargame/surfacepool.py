@@ -0,0 +1,147 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Scratch surfaces reused instead of allocated per frame.
+
+A surface drawn into and thrown away every frame costs an allocation and
+a page-faulting first touch each time.  acquire() hands out a surface of
+the requested size, flags and depth, reusing a released one when it can;
+release() clears it and keeps it for the next caller.  Released surfaces
+are kept up to a byte limit, least recently released dropped first.
+
+    with sugargame.surfacepool.scratch((w, h), pygame.SRCALPHA) as glass:
+        pygame.draw.ellipse(glass, (255, 255, 255, 60), glass.get_rect())
+        screen.blit(glass, pos)
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pygame
+
+DEFAULT_LIMIT = 4 << 20
+
+
+def _bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+class SurfacePool(object):
+    def __init__(self, limit=DEFAULT_LIMIT):
+        self.limit = limit
+        self.bytes = 0
+        self.allocated = 0
+        self.reused = 0
+        self.dropped = 0
+        self._free = OrderedDict()  # (key, serial) -> surface, oldest first
+        self._keys = {}  # id(surface) -> key, for surfaces handed out
+        self._serial = 0
+
+    def acquire(self, size, flags=0, depth=0):
+        """
+        Return a cleared surface of size, flags and depth (0 for the
+        default depth).  Give it back with release() when done.
+        """
+        key = (tuple(size), flags, depth)
+        for free_key in self._free:
+            if free_key[0] == key:
+                surface = self._free.pop(free_key)
+                self.bytes -= _bytes(surface)
+                self.reused += 1
+                break
+        else:
+            if depth:
+                surface = pygame.Surface(size, flags, depth)
+            else:
+                surface = pygame.Surface(size, flags)
+            self.allocated += 1
+        self._keys[id(surface)] = key
+        return surface
+
+    def release(self, surface):
+        """Clear surface and keep it for reuse, within the byte limit."""
+        key = self._keys.pop(id(surface), None)
+        if key is None:
+            return  # not from this pool, or released twice
+        size = _bytes(surface)
+        if size > self.limit:
+            self.dropped += 1
+            return
+        surface.set_clip(None)
+        surface.fill((0, 0, 0, 0))
+        self._serial += 1
+        self._free[(key, self._serial)] = surface
+        self.bytes += size
+        self._trim()
+
+    def _trim(self):
+        while self.bytes > self.limit and self._free:
+            _, surface = self._free.popitem(last=False)
+            self.bytes -= _bytes(surface)
+            self.dropped += 1
+
+    @contextmanager
+    def scratch(self, size, flags=0, depth=0):
+        """Acquire a surface for the duration of a with block."""
+        surface = self.acquire(size, flags, depth)
+        try:
+            yield surface
+        finally:
+            self.release(surface)
+
+    def set_limit(self, limit):
+        self.limit = limit
+        self._trim()
+
+    def clear(self):
+        self._free.clear()
+        self.bytes = 0
+
+    def get_stats(self):
+        return {'allocated': self.allocated, 'reused': self.reused,
+                'dropped': self.dropped, 'free': len(self._free),
+                'in_use': len(self._keys), 'bytes': self.bytes,
+                'limit': self.limit}
+
+
+pool = SurfacePool()
+
+
+def acquire(size, flags=0, depth=0):
+    return pool.acquire(size, flags, depth)
+
+
+def release(surface):
+    pool.release(surface)
+
+
+def scratch(size, flags=0, depth=0):
+    return pool.scratch(size, flags, depth)
+
+
+def set_limit(limit):
+    pool.set_limit(limit)
+
+
+def get_stats():
+    return pool.get_stats()
@@ -0,0 +1,438 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Game state shared between instances of a shared activity.
+
+One instance, the host, owns the state.  The game describes it as a flat
+dict whose keys are strings or integers and whose values are JSON values
+(lists rather than tuples, which come back as lists), and passes it to
+update() every frame.  Only the entries that changed since the last
+update are sent, merged into one message at most rate times a second and
+compressed when that makes them smaller.
+
+The other instances never change the state themselves.  They send
+actions, such as "swap these two tiles", with send_action().  The host
+gets them in arrival order as event.actions, applies them to its state,
+and the result reaches everyone with its next update().  Since only the
+host changes the state, moves made at the same time on different
+machines can't leave the instances disagreeing.
+
+Messages from other instances arrive as Pygame events of event_type on
+the game's own loop.  apply() takes in the host's changes and returns
+them as a dict.  While pending() is true, keep calling update() even if
+nothing changes, so batched messages go out.
+
+    sync = sugargame.sync.Sync(transport, host=is_host)
+    ...
+    for event in pygame.event.get():
+        if event.type == sync.event_type:
+            for key, value in sync.apply(event).items():
+                board[key] = value
+            for action in event.actions:
+                do(action)  # only the host receives actions
+    sync.update(board)
+
+A transport moves bytes between instances: start(on_message, on_peer)
+arranges for on_message(data) to be called with each message from another
+instance and on_peer() when one joins, from any thread; send(data) sends
+to every other instance; close() disconnects.  CollabTransport uses the
+Sugar collaboration service; LocalHub and UnixSocketTransport connect
+instances within one process or on one machine, e.g. for testing.
+"""
+
+import base64
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+import pygame
+
+import sugargame.eventqueue as eventqueue
+
+_RAW = b'j'
+_ZLIB = b'z'
+
+
+def encode(changes, removed=(), actions=()):
+    """Return changes (a dict), removed keys and actions packed into bytes."""
+    message = [list(changes.items())]
+    if removed or actions:
+        message.append(list(removed))
+    if actions:
+        message.append(list(actions))
+    data = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    packed = zlib.compress(data, 9)
+    if len(packed) < len(data):
+        return _ZLIB + packed
+    return _RAW + data
+
+
+def decode(data):
+    """Return the (changes, removed, actions) packed by encode()."""
+    kind, data = data[:1], data[1:]
+    if kind == _ZLIB:
+        data = zlib.decompress(data)
+    elif kind != _RAW:
+        raise ValueError('Unknown sync message type %r' % kind)
+    message = json.loads(data.decode('utf-8'))
+    changes = dict((key, value) for key, value in message[0])
+    removed = message[1] if len(message) > 1 else []
+    actions = message[2] if len(message) > 2 else []
+    return changes, removed, actions
+
+
+class Sync(object):
+    def __init__(self, transport, rate=10, event_type=None, host=True):
+        """
+        transport: where messages go; see the module documentation
+        rate: most messages sent per second; 0 sends on every update
+        event_type: Pygame event type for remote messages; by default a
+            new custom type, available as the event_type attribute
+        host: whether this instance owns the state; exactly one should
+        """
+        if event_type is None:
+            event_type = pygame.event.custom_type()
+        self.event_type = event_type
+        self.host = host
+        self.state = {}  # last state known to every instance
+        self._transport = transport
+        self._interval = 1.0 / rate if rate else 0
+        self._last_send = None
+        self._changes = {}
+        self._removed = set()
+        self._actions = []
+        self._send_all = False
+        # Events the Pygame queue could not take yet, oldest first.
+        self._backlog = deque()
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.sent_bytes = 0
+        self.received = 0
+        self.received_bytes = 0
+        transport.start(self._message_cb, self._peer_cb)
+
+    def _message_cb(self, data):
+        # Runs on the transport's thread.
+        try:
+            changes, removed, actions = decode(data)
+        except (ValueError, TypeError, IndexError, zlib.error) as e:
+            logging.error('Dropping bad sync message: %s' % e)
+            return
+        if not self.host:
+            # Transports send to every instance, but only the host acts;
+            # another instance's actions reach us as the host's changes.
+            actions = []
+            if not changes and not removed:
+                return
+        self._post(pygame.event.Event(self.event_type, changes=changes,
+                                      removed=removed, actions=actions,
+                                      size=len(data)))
+
+    def _peer_cb(self):
+        if not self.host:
+            return
+        # Bring the newcomer up to date with the whole state on the next
+        # update; the empty event wakes a loop waiting for input.
+        self._send_all = True
+        self._post(pygame.event.Event(self.event_type, changes={},
+                                      removed=[], actions=[], size=0))
+
+    def _post(self, event):
+        # Keep the order messages arrived in: while older events wait in
+        # the backlog, newer ones wait behind them.
+        with self._lock:
+            self._backlog.append(event)
+        self._deliver()
+
+    def _deliver(self):
+        # Events posted before Pygame's display is initialized, or to a
+        # full queue, are dropped, so hold them until the queue takes them.
+        with self._lock:
+            while self._backlog:
+                event = self._backlog[0]
+                if not eventqueue.post(event):
+                    return
+                self._backlog.popleft()
+                if event.size:
+                    self.received += 1
+                    self.received_bytes += event.size
+        eventqueue.wakeup()
+
+    def apply(self, event):
+        """
+        Take in the host's changes carried by event and return them as a
+        dict; keys removed are in event.removed.  The game must make the
+        same changes to its own state.  On the host, returns {} and the
+        actions from the other instances are in event.actions; elsewhere
+        event.actions is always empty.
+        """
+        if self.host:
+            return {}
+        for key in event.removed:
+            self.state.pop(key, None)
+        self.state.update(event.changes)
+        return event.changes
+
+    def send_action(self, action):
+        """Send action, a JSON value, to the host."""
+        self._actions.append(action)
+        self.flush()
+
+    def update(self, state=None):
+        """
+        On the host, note what changed in state; on the other instances
+        state is ignored.  Send what is waiting when the rate allows.
+        """
+        self._deliver()
+        if self.host and state is not None:
+            self._diff(state)
+        self.flush()
+
+    def _diff(self, state):
+        for key, value in state.items():
+            if key not in self.state or self.state[key] != value:
+                self.state[key] = self._changes[key] = value
+                self._removed.discard(key)
+        if len(self.state) > len(state):
+            for key in [key for key in self.state if key not in state]:
+                del self.state[key]
+                self._changes.pop(key, None)
+                self._removed.add(key)
+        if self._send_all:
+            self._send_all = False
+            self._changes = dict(self.state)
+
+    def pending(self):
+        """Return True if messages are waiting to be sent or delivered."""
+        unsent = self._changes or self._removed or self._actions
+        return bool(unsent or self._backlog)
+
+    def flush(self, force=False):
+        """Send the waiting changes and actions, if the rate allows."""
+        if not (self._changes or self._removed or self._actions):
+            return
+        now = time.monotonic()
+        if not force and self._last_send is not None and \
+                now - self._last_send < self._interval:
+            return
+        data = encode(self._changes, sorted(self._removed, key=str),
+                      self._actions)
+        self._changes = {}
+        self._removed = set()
+        self._actions = []
+        self._last_send = now
+        self._transport.send(data)
+        self.sent += 1
+        self.sent_bytes += len(data)
+
+    def close(self):
+        self.flush(force=True)
+        self._transport.close()
+
+    def get_stats(self):
+        return {'sent': self.sent, 'sent_bytes': self.sent_bytes,
+                'received': self.received,
+                'received_bytes': self.received_bytes}
+
+
+class CollabTransport(object):
+    """Messages through a sugar3 CollabWrapper, as in a shared activity."""
+
+    KEY = 'sugargame.sync'
+
+    def __init__(self, collab):
+        self._collab = collab
+        self._handlers = []
+
+    def start(self, on_message, on_peer):
+        def message_cb(collab, buddy, msg):
+            if self.KEY in msg:
+                on_message(base64.b64decode(msg[self.KEY]))
+        self._handlers = [
+            self._collab.connect('message', message_cb),
+            self._collab.connect('buddy_joined', lambda *args: on_peer())]
+
+    def send(self, data):
+        self._collab.post({self.KEY: base64.b64encode(data).decode('ascii')})
+
+    def close(self):
+        for handler in self._handlers:
+            self._collab.disconnect(handler)
+        self._handlers = []
+
+
+class LocalHub(object):
+    """Connects instances within one process; connect() makes a transport."""
+
+    def __init__(self):
+        self._peers = []
+        self._lock = threading.Lock()
+
+    def connect(self):
+        return LocalTransport(self)
+
+    def _join(self, peer):
+        with self._lock:
+            others = list(self._peers)
+            self._peers.append(peer)
+        for other in others:
+            other._on_peer()
+
+    def _leave(self, peer):
+        with self._lock:
+            if peer in self._peers:
+                self._peers.remove(peer)
+
+    def _send(self, sender, data):
+        with self._lock:
+            others = [peer for peer in self._peers if peer is not sender]
+        for other in others:
+            other._on_message(data)
+
+
+class LocalTransport(object):
+    def __init__(self, hub):
+        self._hub = hub
+
+    def start(self, on_message, on_peer):
+        self._on_message = on_message
+        self._on_peer = on_peer
+        self._hub._join(self)
+
+    def send(self, data):
+        self._hub._send(self, data)
+
+    def close(self):
+        self._hub._leave(self)
+
+
+_LENGTH = struct.Struct('<I')
+
+
+def _recv_exactly(sock, n):
+    data = b''
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+class UnixSocketTransport(object):
+    """
+    Messages over a Unix domain socket at path.  One instance listens and
+    relays between the others, which connect.
+    """
+
+    def __init__(self, path, listen=False):
+        self.path = path
+        self._listen = listen
+        self._lock = threading.Lock()
+        self._peers = []
+        self._server = None
+        self._closed = False
+        if listen:
+            if os.path.exists(path):
+                os.unlink(path)
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(path)
+            self._server.listen()
+        else:
+            peer = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            peer.connect(path)
+            self._peers.append(peer)
+
+    def start(self, on_message, on_peer):
+        self._on_message = on_message
+        self._on_peer = on_peer
+        if self._server is not None:
+            self._thread(self._accept)
+        for peer in self._peers:
+            self._thread(self._read, peer)
+
+    def _thread(self, target, *args):
+        thread = threading.Thread(target=target, args=args,
+                                  name='sugargame-sync', daemon=True)
+        thread.start()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                peer, _ = self._server.accept()
+            except OSError:
+                break
+            with self._lock:
+                self._peers.append(peer)
+            self._thread(self._read, peer)
+            self._on_peer()
+
+    def _read(self, peer):
+        try:
+            while True:
+                size, = _LENGTH.unpack(_recv_exactly(peer, _LENGTH.size))
+                data = _recv_exactly(peer, size)
+                if self._listen:
+                    self._send(data, skip=peer)
+                self._on_message(data)
+        except (OSError, EOFError):
+            pass
+        with self._lock:
+            if peer in self._peers:
+                self._peers.remove(peer)
+        peer.close()
+
+    def _send(self, data, skip=None):
+        frame = _LENGTH.pack(len(data)) + data
+        with self._lock:
+            for peer in self._peers:
+                if peer is skip:
+                    continue
+                try:
+                    peer.sendall(frame)
+                except OSError as e:
+                    logging.error('Cannot send sync message: %s' % e)
+
+    def send(self, data):
+        self._send(data)
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            peers, self._peers = self._peers, []
+        for peer in peers:
+            try:
+                peer.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            peer.close()
+        if self._server is not None:
+            self._server.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
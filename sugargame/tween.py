@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Time-based tweens.
+
+Tweens are advanced by elapsed milliseconds rather than by frames, so an
+animation takes the same time and follows the same path at any frame rate.
+Usage in a game loop:
+
+    tweener = sugargame.tween.Tweener()
+    slide = tweener.add(sugargame.tween.Tween(120, (1, 0), (0, 0)))
+    ...
+    dt = clock.tick(60)
+    tweener.update(dt)
+    x, y = slide.value
+"""
+
+
+def linear(t):
+    return t
+
+
+def ease_out_quad(t):
+    return t * (2 - t)
+
+
+def ease_in_out_quad(t):
+    if t < 0.5:
+        return 2 * t * t
+    return -1 + (4 - 2 * t) * t
+
+
+def _lerp(start, end, t):
+    if isinstance(start, tuple):
+        return tuple(a + (b - a) * t for a, b in zip(start, end))
+    return start + (end - start) * t
+
+
+class Tween(object):
+    """Interpolates from start to end over duration milliseconds.
+
+    start and end may be numbers or tuples of numbers.  on_done, if given,
+    is called with the tween once it reaches its end value.
+    """
+
+    def __init__(self, duration, start, end, easing=linear, on_done=None):
+        self.duration = duration
+        self.start = start
+        self.end = end
+        self.easing = easing
+        self.on_done = on_done
+        self.elapsed = 0
+        self.value = start
+
+    @property
+    def done(self):
+        return self.elapsed >= self.duration
+
+    def advance(self, dt):
+        self.elapsed = min(self.elapsed + dt, self.duration)
+        if self.duration <= 0:
+            t = 1.0
+        else:
+            t = self.easing(self.elapsed / self.duration)
+        self.value = _lerp(self.start, self.end, t)
+        return self.done
+
+
+class Tweener(object):
+    """Advances the running tweens and drops them once they finish."""
+
+    def __init__(self):
+        self._active = []
+
+    def add(self, tween):
+        self._active.append(tween)
+        return tween
+
+    def cancel(self, tween):
+        if tween in self._active:
+            self._active.remove(tween)
+
+    def clear(self):
+        del self._active[:]
+
+    def is_idle(self):
+        """True when nothing is animating, so the caller may sleep."""
+        return not self._active
+
+    def update(self, dt):
+        """Advance all running tweens by dt milliseconds."""
+        if not self._active:
+            return
+        finished = []
+        for tween in self._active:
+            if tween.advance(dt):
+                finished.append(tween)
+        for tween in finished:
+            self._active.remove(tween)
+            if tween.on_done:
+                tween.on_done(tween)
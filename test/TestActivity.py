@@ -22,6 +22,8 @@
 
 from gettext import gettext as _
 
+import logging
+import os
 import sys
 import gi
 gi.require_version('Gtk', '3.0')
@@ -57,8 +59,11 @@ class TestActivity(Activity):
         # Build the Pygame canvas and start the game running
         # (self.game.run is called when the activity constructor
         # returns).
+        # SUGARGAME_BACKEND=cairo selects the offscreen backend, to
+        # compare frame times with the default 'socket' backend.
         self._pygamecanvas = sugargame.canvas.PygameCanvas(
-            self, main=self.game.run, modules=[pygame.display])
+            self, main=self.game.run, modules=[pygame.display],
+            backend=os.environ.get('SUGARGAME_BACKEND', 'socket'))
 
         # Note that set_canvas implicitly calls read_file when
         # resuming from the Journal.
@@ -112,12 +117,15 @@ class TestActivity(Activity):
 
     def _stop_cb(self, button):
         self.game.running = False
+        logging.info('Frame stats: %r' % self._pygamecanvas.get_frame_stats())
 
     def read_file(self, file_path):
         self.game.read_file(file_path)
 
     def write_file(self, file_path):
         self.game.write_file(file_path)
+        # Shown at once when this entry is resumed.
+        self._pygamecanvas.save_snapshot()
 
     def get_preview(self):
         return self._pygamecanvas.get_preview()
@@ -21,14 +21,23 @@
 # SOFTWARE.
 #
 
+import sys
 import pygame
 import gi
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk
 
+sys.path.append('..')  # Import sugargame package from top directory.
+import sugargame.loop
+
 
 RADIUS = 100
 
+# The ball moves in fixed steps of 1/STEP_RATE seconds whatever the
+# frame rate, and is drawn up to MAX_FPS times a second.
+STEP_RATE = 30
+MAX_FPS = 60
+
 
 class TestGame:
 
@@ -39,6 +48,10 @@ class TestGame:
         self.x = -RADIUS
         self.y = RADIUS
 
+        # Position at the previous step, for interpolating between steps.
+        self.prev_x = self.x
+        self.prev_y = self.y
+
         self.vx = RADIUS // 10
         self.vy = 0
 
@@ -56,21 +69,63 @@ class TestGame:
     def read_file(self, file_path):
         pass
 
+    # Advance the simulation by one fixed step.
+    def update(self, dt):
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+        self.x += self.vx * self.direction
+        if self.direction == 1 and self.x > self.width - RADIUS:
+            self.x = self.width - RADIUS
+            self.direction = -1
+        elif self.direction == -1 and self.x < RADIUS:
+            self.x = RADIUS
+            self.direction = 1
+
+        self.y += self.vy
+        if self.y > self.height - RADIUS:
+            self.y = self.height - RADIUS
+            self.vy = -self.vy
+
+        self.vy += 5
+
+    # Draw the ball between its last two positions.
+    def render(self, alpha):
+        if self.drawn is not None:
+            # Erase the ball
+            self.dirty.append(pygame.draw.circle(self.screen, (255, 255, 255),
+                                                 self.drawn, RADIUS))
+
+        x = round(self.prev_x + (self.x - self.prev_x) * alpha)
+        y = round(self.prev_y + (self.y - self.prev_y) * alpha)
+        self.drawn = (x, y)
+
+        # Draw the ball
+        self.dirty.append(pygame.draw.circle(self.screen, (192, 0, 0),
+                                             self.drawn, RADIUS))
+
     # The main game loop.
     def run(self):
         self.running = True
 
-        screen = pygame.display.get_surface()
-        width = screen.get_width()
-        height = screen.get_height()
+        self.screen = pygame.display.get_surface()
+        self.width = self.screen.get_width()
+        self.height = self.screen.get_height()
+        self.drawn = None
+
+        self.dirty = []
+        self.dirty.append(pygame.draw.rect(self.screen, (255, 255, 255),
+                                           pygame.Rect(0, 0,
+                                                       self.width,
+                                                       self.height)))
+        pygame.display.update(self.dirty)
 
-        dirty = []
-        dirty.append(pygame.draw.rect(screen, (255, 255, 255),
-                                      pygame.Rect(0, 0, width, height)))
-        pygame.display.update(dirty)
+        stepper = sugargame.loop.FixedStep(self.update, self.render,
+                                           rate=STEP_RATE)
+        self.clock.tick()
 
         while self.running:
-            dirty = []
+            self.dirty = []
 
             # Pump GTK messages.
             while Gtk.events_pending():
@@ -84,48 +139,27 @@ class TestGame:
                     return
                 elif event.type == pygame.VIDEORESIZE:
                     pygame.display.set_mode(event.size, pygame.RESIZABLE)
-                    width = screen.get_width()
-                    height = screen.get_height()
-                    dirty.append(pygame.draw.rect(screen, (255, 255, 255),
-                                                  pygame.Rect(0, 0,
-                                                              width, height)))
+                    self.screen = pygame.display.get_surface()
+                    self.width = self.screen.get_width()
+                    self.height = self.screen.get_height()
+                    self.dirty.append(pygame.draw.rect(
+                        self.screen, (255, 255, 255),
+                        pygame.Rect(0, 0, self.width, self.height)))
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_LEFT:
                         self.direction = -1
                     elif event.key == pygame.K_RIGHT:
                         self.direction = 1
 
-            # Move the ball
-            if not self.paused:
-
-                # Erase the ball
-                dirty.append(pygame.draw.circle(screen, (255, 255, 255),
-                                                (self.x, self.y), RADIUS))
-
-                self.x += self.vx * self.direction
-                if self.direction == 1 and self.x > width - RADIUS:
-                    self.x = width - RADIUS
-                    self.direction = -1
-                elif self.direction == -1 and self.x < RADIUS:
-                    self.x = RADIUS
-                    self.direction = 1
-
-                self.y += self.vy
-                if self.y > height - RADIUS:
-                    self.y = height - RADIUS
-                    self.vy = -self.vy
+            # Try to stay at MAX_FPS; the ball keeps its speed regardless.
+            elapsed = self.clock.tick(MAX_FPS)
 
-                self.vy += 5
-
-                # Draw the ball
-                dirty.append(pygame.draw.circle(screen, (192, 0, 0),
-                                                (self.x, self.y), RADIUS))
+            # Move and draw the ball
+            if not self.paused:
+                stepper.frame(elapsed)
 
             # Update Display
-            pygame.display.update(dirty)
-
-            # Try to stay at 30 FPS
-            self.clock.tick(30)
+            pygame.display.update(self.dirty)
 
 
 # This function is called when the game is run directly from the command line:
@@ -0,0 +1,71 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# Session capture to PNG, using SDL's dummy video driver.  Run from the
+# top of the source tree with:  python -m unittest discover test
+
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from sugargame.capture import Recorder
+
+
+class RecorderTest(unittest.TestCase):
+
+    def setUp(self):
+        pygame.display.init()
+        self.screen = pygame.display.set_mode((64, 48))
+        self.dir = tempfile.mkdtemp()
+        self.recorder = Recorder(self.dir)
+
+    def tearDown(self):
+        self.recorder.stop()
+        pygame.display.quit()
+
+    def test_frames(self):
+        self.screen.fill((255, 0, 0))
+        self.recorder.capture(self.screen)
+        self.recorder.capture(self.screen)  # unchanged
+        self.recorder.capture(self.screen, [])
+        self.recorder.capture(self.screen, [pygame.Rect(3, 3, 0, 5), None])
+        self.screen.fill((0, 0, 255), (0, 0, 8, 8))
+        self.recorder.capture(self.screen, (0, 0, 8, 8))
+        stats = self.recorder.stop()
+        self.assertEqual(stats, {'captured': 3, 'skipped': 1,
+                                 'dropped': 0, 'written': 2})
+        with open(os.path.join(self.dir, 'frames.txt')) as f:
+            names = [line.split()[0] for line in f]
+        self.assertEqual(names, ['frame-000000.png', 'frame-000001.png'])
+        frame = pygame.image.load(os.path.join(self.dir, names[1]))
+        self.assertEqual(frame.get_at((0, 0))[:3], (0, 0, 255))
+        self.assertEqual(frame.get_at((20, 20))[:3], (255, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
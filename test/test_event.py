@@ -0,0 +1,122 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# Exposed areas reported by the GTK event translator, using SDL's dummy
+# video driver and stand-ins for the activity and canvas widgets.  Run
+# from the top of the source tree with:  python -m unittest discover test
+
+import os
+import sys
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import gi
+    gi.require_version('Gdk', '3.0')
+    import pygame
+    from sugargame.event import Translator
+except (ImportError, ValueError):
+    Translator = None
+
+
+class FakeWidget(object):
+    """Accepts what the translator sets up on the activity and canvas."""
+
+    def __init__(self):
+        self.signals = []
+
+    def add_events(self, mask):
+        pass
+
+    def set_events(self, mask):
+        pass
+
+    def set_can_focus(self, can_focus):
+        pass
+
+    def connect(self, signal, callback):
+        self.signals.append(signal)
+
+
+class Rectangle(object):
+    def __init__(self, x, y, width, height):
+        self.x, self.y, self.width, self.height = x, y, width, height
+
+
+class FakeContext(object):
+    """Stands in for the cairo context handed to a draw handler."""
+
+    def __init__(self, rects):
+        self.rects = rects
+
+    def copy_clip_rectangle_list(self):
+        return self.rects
+
+
+@unittest.skipIf(Translator is None, 'needs PyGObject and pygame')
+class ExposeTest(unittest.TestCase):
+
+    def setUp(self):
+        pygame.display.init()
+        pygame.display.set_mode((64, 48))
+        pygame.event.clear()
+        self.activity = FakeWidget()
+        self.translator = Translator(self.activity, FakeWidget())
+
+    def tearDown(self):
+        pygame.display.quit()
+
+    def exposed(self):
+        return [event.rects for event in pygame.event.get(pygame.VIDEOEXPOSE)]
+
+    def test_draw_reports_clip_rects(self):
+        context = FakeContext([Rectangle(1, 2, 10.5, 3),
+                               Rectangle(20, 0, 4, 4)])
+        self.translator.draw_cb(None, context)
+        self.assertEqual(self.exposed(), [[pygame.Rect(1, 2, 11, 3),
+                                           pygame.Rect(20, 0, 4, 4)]])
+
+    def test_empty_clip_posts_nothing(self):
+        self.translator.draw_cb(None, FakeContext([]))
+        self.assertEqual(self.exposed(), [])
+
+    def test_whole_display(self):
+        self.translator.update_display()
+        self.assertEqual(self.exposed(), [[pygame.Rect(0, 0, 64, 48)]])
+
+    def test_no_visibility_expose(self):
+        # draw_cb reports what was uncovered; visibility changes don't
+        # make the game redraw everything.
+        self.assertNotIn('visibility-notify-event', self.activity.signals)
+
+    def test_repaint(self):
+        repainted = []
+        self.translator.set_repaint(repainted.append)
+        self.translator.draw_cb(None, FakeContext([Rectangle(0, 0, 5, 5)]))
+        self.assertEqual(repainted, [[pygame.Rect(0, 0, 5, 5)]])
+        self.assertEqual(self.exposed(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# Executor results posted as Pygame events, cancellation and the pending
+# task limit, using SDL's dummy video driver.  Run from the top of the
+# source tree with:  python -m unittest discover test
+
+import os
+import queue
+import sys
+import threading
+import time
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from sugargame.executor import Executor
+
+
+def fail():
+    raise ValueError('no level')
+
+
+class ExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        pygame.display.init()
+        pygame.event.clear()
+        self.gate = threading.Event()
+        self.executor = Executor(workers=1, max_pending=2)
+
+    def tearDown(self):
+        self.gate.set()
+        self.executor.shutdown(wait=True)
+        pygame.display.quit()
+
+    def collect(self, count, timeout=2.0):
+        """Return the next count executor events, failing after timeout."""
+        events = []
+        deadline = time.monotonic() + timeout
+        while len(events) < count:
+            self.assertLess(time.monotonic(), deadline, 'no task event')
+            events.extend(event for event in pygame.event.get()
+                          if event.type == self.executor.event_type)
+            time.sleep(0.005)
+        return events
+
+    def test_result_event(self):
+        task = self.executor.submit(sum, [1, 2, 3], tag='sum')
+        event, = self.collect(1)
+        self.assertIs(event.task, task)
+        self.assertEqual((event.tag, event.result, event.error),
+                         ('sum', 6, None))
+        self.assertTrue(task.done())
+
+    def test_error_event(self):
+        self.executor.submit(fail)
+        event, = self.collect(1)
+        self.assertIsNone(event.result)
+        self.assertIsInstance(event.error, ValueError)
+
+    def test_cancel(self):
+        running = self.executor.submit(self.gate.wait)
+        queued = self.executor.submit(sum, [1])
+        running.cancel()
+        queued.cancel()
+        self.assertTrue(running.cancelled() and queued.cancelled())
+        self.gate.set()
+        # Neither task posts an event, and both free their slots.
+        done = self.executor.submit(sum, [2], tag='after')
+        event, = self.collect(1)
+        self.assertIs(event.task, done)
+        self.assertEqual(pygame.event.get(self.executor.event_type), [])
+
+    def test_max_pending(self):
+        self.executor.submit(self.gate.wait)
+        self.executor.submit(sum, [1])
+        with self.assertRaises(queue.Full):
+            self.executor.submit(sum, [2])
+        self.gate.set()
+        self.collect(2)
+        self.executor.submit(sum, [3])
+        event, = self.collect(1)
+        self.assertEqual(event.result, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# Checks that importing sugargame stays cheap.  Run from the top of the
+# source tree with:  python -m unittest discover test
+
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative microseconds "import sugargame" may take.  It is well under
+# a millisecond when the package imports nothing eagerly; pulling in GTK,
+# Sugar or pygame costs tens to hundreds of milliseconds.
+BUDGET_US = 20000
+
+
+def run_python(*args):
+    return subprocess.run([sys.executable] + list(args), cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    def test_import_budget(self):
+        result = run_python('-X', 'importtime', '-c', 'import sugargame')
+        # Lines read "import time: self [us] | cumulative | name".
+        for line in result.stderr.splitlines():
+            fields = [field.strip() for field in line.split('|')]
+            if len(fields) == 3 and fields[2] == 'sugargame':
+                cumulative = int(fields[1])
+                break
+        else:
+            self.fail('no sugargame entry in -X importtime output')
+        self.assertLess(cumulative, BUDGET_US,
+                        'import sugargame took %d us' % cumulative)
+
+    def test_pure_helpers_need_no_gtk_or_pygame(self):
+        result = run_python('-c', 'import sys, sugargame.tween; '
+                            'print(sorted(m for m in ("gi", "pygame") '
+                            'if m in sys.modules))')
+        self.assertEqual(result.stdout.strip(), '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
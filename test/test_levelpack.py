@@ -0,0 +1,126 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# Level pack format, index and validation.  Run from the top of the
+# source tree with:  python -m unittest discover test
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import levelpack
+from levelpack import HEADER, INDEX_ENTRY, MAGIC, LevelPack, PackError
+
+LEVELS = [
+    {"solution": [[1, 2, 3], [2, 3, 1], [3, 1, 2]]},
+    {"solution": [[2, 1, 2], [1, 3, 1], [2, 1, 2]], "swaps": 3},
+    {"solution": [[3, 3, 1], [2, 1, 2], [1, 2, 3]], "seed": 7},
+    {"solution": [[1, 1, 1], [2, 2, 2], [3, 3, 3]]},
+]
+
+
+class LevelPackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'levels.pack')
+        self.assertEqual(levelpack.write_pack(self.path, LEVELS), 4)
+
+    def test_layout(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        magic, version, _, count, index_offset = HEADER.unpack_from(data)
+        self.assertEqual((magic, version, count), (MAGIC, 1, 4))
+        self.assertEqual(index_offset + 4 * INDEX_ENTRY.size, len(data))
+        offset, length = INDEX_ENTRY.unpack_from(data, index_offset)
+        self.assertEqual(offset, HEADER.size)
+        self.assertEqual(json.loads(data[offset:offset + length]), LEVELS[0])
+
+    def check_round_trip(self):
+        with LevelPack(self.path) as pack:
+            self.assertEqual(len(pack), len(LEVELS))
+            self.assertEqual([pack[i] for i in range(len(pack))], LEVELS)
+            self.assertEqual(pack[-1], LEVELS[-1])
+            with self.assertRaises(IndexError):
+                pack[len(LEVELS)]
+            return pack._data is not None
+
+    def test_round_trip_mmap(self):
+        self.assertTrue(self.check_round_trip())
+
+    def test_round_trip_without_mmap(self):
+        with mock.patch('levelpack.mmap.mmap', side_effect=OSError):
+            self.assertFalse(self.check_round_trip())
+
+    def test_keeps_most_recent_levels(self):
+        with LevelPack(self.path, keep=2) as pack:
+            first = pack[0]
+            pack[1]
+            self.assertIs(pack[0], first)  # still cached
+            pack[2]  # evicts 1, the least recently used
+            self.assertEqual(sorted(pack._cache), [0, 2])
+            pack.prefetch(3)
+            pack.prefetch(99)  # out of range: ignored
+            self.assertEqual(sorted(pack._cache), [2, 3])
+
+    def test_not_a_pack(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a level pack at all')
+        with self.assertRaises(PackError):
+            LevelPack(self.path)
+
+    def test_check_level_swaps_and_seed(self):
+        solution = LEVELS[0]["solution"]
+        for extra in ({"swaps": 1}, {"swaps": 8}, {"seed": 3},
+                      {"seed": "easy"}):
+            level = dict(extra, solution=solution)
+            self.assertIsNone(levelpack.check_level(level), extra)
+        for extra in ({"swaps": "x"}, {"swaps": 0}, {"swaps": 9},
+                      {"swaps": True}, {"swaps": 2.5}, {"seed": [1]},
+                      {"seed": 1.5}, {"seed": False}):
+            level = dict(extra, solution=solution)
+            self.assertIsNotNone(levelpack.check_level(level), extra)
+
+    def test_validate_rejects_bad_levels_in_parallel(self):
+        levels = LEVELS * 4
+        levels[5] = {"solution": [[1, 2], [2, 1]]}
+        levels[11] = {"solution": [[1, 2, 3], [2, 9, 1], [3, 1, 2]]}
+        levelpack.write_pack(self.path, levels)
+        errors = levelpack.validate_pack(self.path, jobs=3)
+        self.assertEqual([i for i, _ in errors], [5, 11])
+        self.assertEqual(levelpack.validate_pack(self.path, jobs=1), errors)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = levelpack.main(['validate', self.path, '--jobs', '2'])
+        self.assertEqual(status, 1)
+        self.assertIn('2 problem(s)', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
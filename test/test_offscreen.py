@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# Exercises the 'cairo' PygameCanvas backend's offscreen display without
+# a window: SDL's dummy video driver and a stand-in for the DrawingArea.
+# Run from the top of the source tree with:
+#   python -m unittest discover test
+
+import os
+import sys
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import cairo
+    import pygame
+except ImportError:
+    cairo = None
+
+
+class Allocation(object):
+    width = 64
+    height = 48
+
+
+class FakeWidget(object):
+    """Records what a Gtk.DrawingArea would be asked to redraw."""
+
+    def __init__(self):
+        self.queued = []
+
+    def get_allocation(self):
+        return Allocation()
+
+    def queue_draw(self):
+        self.queued.append(None)
+
+    def queue_draw_area(self, x, y, width, height):
+        self.queued.append((x, y, width, height))
+
+
+@unittest.skipIf(cairo is None, 'needs pycairo and pygame')
+class OffscreenDisplayTest(unittest.TestCase):
+
+    def setUp(self):
+        from sugargame.canvas import FrameStats
+        from sugargame.offscreen import OffscreenDisplay
+
+        self._saved = dict((name, getattr(pygame.display, name))
+                           for name in ('set_mode', 'get_surface',
+                                        'flip', 'update'))
+        pygame.display.init()
+        self.widget = FakeWidget()
+        self.stats = FrameStats()
+        self.display = OffscreenDisplay(self.widget, self.stats)
+        self.display.hook_pygame()
+        self.screen = pygame.display.set_mode()
+
+    def tearDown(self):
+        for name, func in self._saved.items():
+            setattr(pygame.display, name, func)
+        pygame.display.quit()
+
+    def test_widget_size_and_shared_pixels(self):
+        self.assertEqual(self.screen.get_size(), (64, 48))
+        self.assertIs(pygame.display.get_surface(), self.screen)
+        self.screen.fill((10, 20, 30))
+        pygame.display.flip()
+        # cairo sees pygame's pixels without a copy.
+        data = bytes(self.display._image.get_data())
+        pixel = int.from_bytes(data[:4], sys.byteorder) & 0xffffff
+        self.assertEqual(pixel, (10 << 16) | (20 << 8) | 30)
+
+    def test_update_queues_only_damaged_rectangles(self):
+        del self.widget.queued[:]
+        pygame.display.update([pygame.Rect(4, 4, 8, 8),
+                               pygame.Rect(60, 40, 20, 20)])
+        self.assertEqual(self.widget.queued, [(4, 4, 8, 8), (60, 40, 4, 8)])
+
+    def test_convert_works_without_a_window(self):
+        image = pygame.Surface((4, 4))
+        image.fill((200, 100, 50))
+        self.screen.blit(image.convert(), (0, 0))
+        self.screen.blit(image.convert_alpha(), (4, 0))
+        self.assertEqual(self.screen.get_at((5, 1))[:3], (200, 100, 50))
+
+    def test_paint_time_is_counted(self):
+        # As PygameCanvas does: presents are timed, then GTK paints.
+        self.stats.timed(pygame.display.flip)()
+        surface = cairo.ImageSurface(cairo.FORMAT_RGB24, 64, 48)
+        self.display.draw_cb(self.widget, cairo.Context(surface))
+        stats = self.stats.get()
+        self.assertEqual(stats['frames'], 1)
+        self.assertGreater(stats['paint_ms'], 0)
+        self.assertAlmostEqual(stats['frame_ms'],
+                               stats['mean_ms'] + stats['paint_ms'])
+
+
+if __name__ == '__main__':
+    unittest.main()
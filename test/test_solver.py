@@ -0,0 +1,116 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# The solver against brute force: breadth-first search over swaps on
+# small random boards.  Run from the top of the source tree with:
+#   python -m unittest discover test
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import solver
+
+
+def bfs_distances(target):
+    """Return {board: fewest swaps from target} for every arrangement."""
+    start = tuple(target)
+    distances = {start: 0}
+    frontier = [start]
+    n = len(start)
+    while frontier:
+        following = []
+        for board in frontier:
+            for i in range(n):
+                for j in range(i + 1, n):
+                    if board[i] == board[j]:
+                        continue
+                    swapped = list(board)
+                    swapped[i], swapped[j] = swapped[j], swapped[i]
+                    swapped = tuple(swapped)
+                    if swapped not in distances:
+                        distances[swapped] = distances[board] + 1
+                        following.append(swapped)
+        frontier = following
+    return distances
+
+
+class SolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(2024)
+        self.targets = [[1, 2, 3, 2, 3, 1, 3, 1, 2],
+                        [1, 1, 1, 2, 2, 2, 3, 3, 3],
+                        [1, 2, 1, 2, 1, 2, 3, 3, 1]]
+        for _ in range(4):
+            # Occasionally four colours, to reach longer cycles.
+            self.targets.append([self.rng.randint(1, 4) for _ in range(8)])
+
+    def test_min_swaps_matches_bfs(self):
+        for target in self.targets:
+            distances = bfs_distances(target)
+            for board in self.rng.sample(sorted(distances),
+                                         min(200, len(distances))):
+                self.assertEqual(solver.min_swaps(list(board), target),
+                                 distances[board], (board, target))
+
+    def test_min_swaps_takes_rows(self):
+        rows = [[2, 1, 3], [2, 3, 1], [3, 1, 2]]
+        target = [[1, 2, 3], [2, 3, 1], [3, 1, 2]]
+        self.assertEqual(solver.min_swaps(rows, target), 1)
+        with self.assertRaises(ValueError):
+            solver.min_swaps([[1, 1, 1]] * 3, target)
+
+    def test_hint_is_on_a_shortest_path(self):
+        for target in self.targets:
+            distances = bfs_distances(target)
+            for board in self.rng.sample(sorted(distances),
+                                         min(100, len(distances))):
+                board = list(board)
+                swap = solver.hint(board, target)
+                if distances[tuple(board)] == 0:
+                    self.assertIsNone(swap)
+                    continue
+                before = distances[tuple(board)]
+                i, j = swap
+                board[i], board[j] = board[j], board[i]
+                self.assertEqual(distances[tuple(board)], before - 1)
+
+    def test_shuffle_is_exactly_that_far(self):
+        for target in self.targets:
+            distances = bfs_distances(target)
+            farthest = max(distances.values())
+            for swaps in range(1, farthest + 1):
+                board = solver.shuffle(target, swaps, seed=swaps)
+                self.assertEqual(sorted(board), sorted(target))
+                self.assertEqual(distances[tuple(board)], swaps)
+                self.assertEqual(solver.shuffle(target, swaps, seed=swaps),
+                                 board)
+            with self.assertRaises(ValueError):
+                solver.shuffle(target, farthest + 1, seed=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
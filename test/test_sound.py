@@ -0,0 +1,128 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# Sound manager cache, failures and channel stealing, using SDL's dummy
+# audio driver.  Run from the top of the source tree with:
+#     python -m unittest discover test
+
+import os
+import sys
+import tempfile
+import unittest
+import wave
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from sugargame.sound import SoundManager, sound_bytes
+
+FREQUENCY = 22050
+
+
+def write_wav(path, seconds):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(FREQUENCY)
+        f.writeframes(b'\0\1' * int(FREQUENCY * seconds))
+
+
+class SoundManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        pygame.mixer.init(FREQUENCY, -16, 1)
+        self.dir = tempfile.mkdtemp()
+        for name in ('a.wav', 'b.wav', 'c.wav'):
+            write_wav(os.path.join(self.dir, name), 0.5)
+        self.sounds = None
+
+    def tearDown(self):
+        if self.sounds is not None:
+            self.sounds.close()
+        pygame.mixer.quit()
+
+    def manager(self, **kwargs):
+        self.sounds = SoundManager(self.dir, **kwargs)
+        return self.sounds
+
+    def test_lru_budget(self):
+        sounds = self.manager()
+        size = sound_bytes(sounds.wait('a.wav'))
+        self.assertEqual(size, FREQUENCY)  # half a second of 16-bit mono
+        sounds.budget = 2 * size
+        sounds.wait('b.wav')
+        sounds.get('a.wav')  # a is now more recent than b
+        sounds.wait('c.wav')
+        self.assertIsNotNone(sounds.get('a.wav'))
+        self.assertIsNone(sounds.get('b.wav'))
+        self.assertIsNotNone(sounds.get('c.wav'))
+        stats = sounds.get_stats()
+        self.assertEqual((stats['sounds'], stats['bytes']), (2, 2 * size))
+
+    def test_newest_kept_over_budget(self):
+        sounds = self.manager(budget=1)
+        sounds.wait('a.wav')
+        sounds.wait('b.wav')
+        self.assertIsNone(sounds.get('a.wav'))
+        self.assertIsNotNone(sounds.get('b.wav'))
+
+    def test_wait_reuses_decoded(self):
+        sounds = self.manager()
+        sound = sounds.wait('a.wav')
+        future = sounds.load('a.wav')
+        self.assertTrue(future.done())
+        self.assertIs(future.result(), sound)
+        self.assertIs(sounds.wait('a.wav'), sound)
+
+    def test_failed_not_retried(self):
+        sounds = self.manager()
+        with self.assertLogs(level='ERROR'):
+            self.assertIsNone(sounds.wait('missing.wav'))
+        self.assertEqual(sounds.get_stats()['failed'], 1)
+        future = sounds.load('missing.wav')
+        self.assertTrue(future.done())
+        self.assertIsNone(future.result())
+        self.assertIsNone(sounds.play('missing.wav'))
+        stats = sounds.get_stats()
+        self.assertEqual((stats['failed'], stats['pending']), (1, 0))
+
+    def test_priority_stealing(self):
+        sounds = self.manager(channels=2)
+        for name in ('a.wav', 'b.wav', 'c.wav'):
+            sounds.wait(name)
+        low = sounds.play('a.wav', priority=1, loops=-1)
+        high = sounds.play('b.wav', priority=5, loops=-1)
+        self.assertIsNotNone(low)
+        self.assertIsNotNone(high)
+        self.assertIsNot(low, high)
+        # Every channel is busy with a higher-priority sound.
+        self.assertIsNone(sounds.play('c.wav', priority=0))
+        # Equal or higher priority steals the lowest-priority voice.
+        self.assertIs(sounds.play('c.wav', priority=1), low)
+        self.assertIs(sounds.play('a.wav', priority=3), low)
+        self.assertIsNone(sounds.play('c.wav', priority=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
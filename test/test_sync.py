@@ -0,0 +1,198 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# Instances of the Tile Swap game sharing one board through
+# sugargame.sync, standing in for a shared Sugar activity.  Run from the
+# top of the source tree with:  python -m unittest discover test
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ['XDG_CACHE_HOME'] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+import main
+from sugargame.sync import LocalHub, Sync, UnixSocketTransport, decode
+
+
+def flat(game):
+    return [value for row in game.board() for value in row]
+
+
+def pump(games, timeout=2.0):
+    """Run frames until no game has messages waiting."""
+    deadline = time.monotonic() + timeout
+    events = pygame.event.get()
+    while time.monotonic() < deadline:
+        for game in games:
+            game.frame(events, 16)
+        # Frames may post messages of their own; look again before stopping.
+        events = pygame.event.get()
+        busy = any(game.sync.pending() for game in games)
+        if not events and not busy:
+            return
+        time.sleep(0.005)
+    raise AssertionError('sync did not settle')
+
+
+class SharedGameTest(unittest.TestCase):
+
+    def setUp(self):
+        hub = LocalHub()
+        self.host = main.SwapPuzzleGame(hub.connect(), host=True)
+        self.guest = main.SwapPuzzleGame(hub.connect(), host=False)
+        pump([self.host, self.guest])
+
+    def tearDown(self):
+        self.host.sync.close()
+        self.guest.sync.close()
+        pygame.event.clear()
+
+    def test_guest_gets_host_board(self):
+        self.assertEqual(flat(self.guest), flat(self.host))
+        self.assertEqual(self.guest.level, self.host.level)
+
+    def test_swap_sends_a_few_bytes(self):
+        sent = self.host.sync.sent_bytes
+        self.host.perform(["swap", 0, 8])
+        pump([self.host, self.guest])
+        self.assertLess(self.host.sync.sent_bytes - sent, 32)
+        self.assertEqual(flat(self.guest), flat(self.host))
+
+    def test_simultaneous_swaps_agree(self):
+        target = sorted(value for row in self.host.solution for value in row)
+        # Both move before either hears of the other's move.
+        self.host.act(["swap", 0, 1])
+        self.guest.act(["swap", 1, 2])
+        pump([self.host, self.guest])
+        self.assertEqual(flat(self.guest), flat(self.host))
+        self.assertEqual(sorted(flat(self.host)), target)
+        self.assertEqual(self.guest.moves, 2)
+        self.guest.show_hint()  # the board is still solvable
+
+    def test_guest_changes_level_through_host(self):
+        self.guest.act(["level", 1])
+        self.assertEqual(self.guest.level, 0)
+        pump([self.host, self.guest])
+        self.assertEqual((self.host.level, self.guest.level), (1, 1))
+        self.assertEqual(flat(self.guest), flat(self.host))
+
+    def test_bad_actions_are_ignored(self):
+        before = flat(self.host)
+        for action in (["swap", 0, 99], ["swap", "a", 1], ["level", -1],
+                       "restart", [], ["dance"]):
+            self.guest.sync.send_action(action)
+        pump([self.host, self.guest])
+        self.assertEqual(flat(self.host), before)
+
+
+class ThreeGameTest(unittest.TestCase):
+
+    def setUp(self):
+        hub = LocalHub()
+        self.host = main.SwapPuzzleGame(hub.connect(), host=True)
+        self.guests = [main.SwapPuzzleGame(hub.connect(), host=False)
+                       for _ in range(2)]
+        self.games = [self.host] + self.guests
+        pump(self.games)
+
+    def tearDown(self):
+        for game in self.games:
+            game.sync.close()
+        pygame.event.clear()
+
+    def test_guest_action_performed_once(self):
+        # The hub hands the first guest's action to the second guest too;
+        # only the host may perform it, the guests follow its changes.
+        performed = []
+        for guest in self.guests:
+            guest.perform = performed.append
+        before = flat(self.host)
+        self.guests[0].act(["swap", 0, 8])
+        pump(self.games)
+        self.assertEqual(performed, [])
+        before[0], before[8] = before[8], before[0]
+        for game in self.games:
+            self.assertEqual(flat(game), before)
+            self.assertEqual(game.moves, 1)
+
+    def test_guests_moving_together_agree(self):
+        self.guests[0].act(["swap", 0, 1])
+        self.guests[1].act(["swap", 1, 2])
+        self.host.act(["swap", 3, 4])
+        pump(self.games)
+        for guest in self.guests:
+            self.assertEqual(flat(guest), flat(self.host))
+            self.assertEqual(guest.moves, 3)
+
+
+class SyncDeliveryTest(unittest.TestCase):
+
+    def test_messages_before_display_init_are_kept(self):
+        pygame.display.quit()
+        hub = LocalHub()
+        host = Sync(hub.connect(), rate=0)
+        guest = Sync(hub.connect(), rate=0, host=False)
+        host.update({0: 1, 1: 2})
+        self.assertEqual(guest.received, 0)
+        self.assertTrue(guest.pending())
+        pygame.display.init()
+        guest.update()
+        changes = {}
+        for event in pygame.event.get(guest.event_type):
+            changes.update(guest.apply(event))
+        self.assertEqual(changes, {0: 1, 1: 2})
+        self.assertEqual(guest.received, 1)
+        self.assertFalse(guest.pending())
+
+    def test_unix_socket_relays_between_guests(self):
+        pygame.display.init()
+        path = os.path.join(tempfile.mkdtemp(), 'sync.sock')
+        received = []
+        host = UnixSocketTransport(path, listen=True)
+        host.start(received.append, lambda: None)
+        guests = [UnixSocketTransport(path) for _ in range(2)]
+        heard = []
+        guests[0].start(lambda data: None, lambda: None)
+        guests[1].start(heard.append, lambda: None)
+        try:
+            guests[0].send(b'j[[],[],[["swap",0,1]]]')
+            deadline = time.monotonic() + 2
+            while (not received or not heard) and \
+                    time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(decode(received[0])[2], [["swap", 0, 1]])
+            self.assertEqual(heard, received)
+        finally:
+            for transport in guests + [host]:
+                transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#
+# Copyright (c) 2020 Wade Brainerd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+# Level picker thumbnails rendered in worker processes, using SDL's
+# dummy video driver.  Run from the top of the source tree with:
+#     python -m unittest discover test
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from thumbnails import Thumbnails
+
+COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+LEVELS = [
+    {"solution": [[1, 2, 3], [2, 3, 1], [3, 1, 2]]},
+    {"solution": [[1, 2, 3], [2, 3, 1], [3, 1, 4]]},  # no colour 4
+]
+
+
+class ThumbnailsTest(unittest.TestCase):
+
+    def setUp(self):
+        pygame.display.init()
+        pygame.display.set_mode((64, 48))
+        pygame.event.clear()
+        self.thumbs = Thumbnails(LEVELS, COLORS, tempfile.mkdtemp(),
+                                 workers=1)
+
+    def tearDown(self):
+        self.thumbs.close()
+        pygame.display.quit()
+
+    def wait(self, index, size, timeout=10.0):
+        """Handle render events until index is no longer pending."""
+        deadline = time.monotonic() + timeout
+        while (index, size) in self.thumbs._pending:
+            self.assertLess(time.monotonic(), deadline, 'render not done')
+            for event in pygame.event.get():
+                self.thumbs.handle_event(event)
+            time.sleep(0.01)
+
+    def test_render_and_reuse(self):
+        self.assertIsNone(self.thumbs.get(0, 30))
+        self.wait(0, 30)
+        surface = self.thumbs.get(0, 30)
+        self.assertEqual(surface.get_size(), (30, 30))
+        self.assertEqual(surface.get_at((5, 5))[:3], COLORS[0])
+        self.assertEqual(len(os.listdir(self.thumbs.cache_dir)), 1)
+
+    def test_failed_not_retried(self):
+        with self.assertLogs(level='ERROR'):
+            self.assertIsNone(self.thumbs.get(1, 30))
+            self.wait(1, 30)
+        for _ in range(3):
+            self.assertIsNone(self.thumbs.get(1, 30))
+        self.assertEqual(self.thumbs._pending, {})
+        # Another size of the same level is a different thumbnail.
+        self.assertIsNone(self.thumbs.get(1, 60))
+        self.assertIn((1, 60), self.thumbs._pending)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Level thumbnails for the Tile Swap Puzzle level picker.
+
+Thumbnails are rendered in worker processes and written as PNGs to an
+on-disk cache named by a hash of the level's pattern, the thumbnail size
+and the colours, so they are rendered once per machine rather than once
+per launch.  Only thumbnails that are asked for are rendered or loaded;
+until one is ready, get() returns None and the caller draws a placeholder.
+A thumbnail that fails to render keeps its placeholder and is not tried
+again for the same level.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import pygame
+import sugargame.assets
+import sugargame.cache
+from sugargame.executor import Executor
+from sugargame.loop import IN_BROWSER
+
+def render_thumbnail(solution, size, colors, path):
+    """Draw solution as a size x size PNG at path; runs in a worker process."""
+    n = len(solution)
+    cell = size // n
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    for r, row in enumerate(solution):
+        for c, value in enumerate(row):
+            rect = pygame.Rect(c*cell + 1, r*cell + 1, cell - 2, cell - 2)
+            pygame.draw.rect(surface, colors[value-1], rect, border_radius=max(2, cell//6))
+    tmp = path + '.tmp.png'
+    pygame.image.save(surface, tmp)
+    os.replace(tmp, path)
+    return path
+
+def thumbnail_key(level, size, colors):
+    data = json.dumps([level["solution"], size, colors], separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+class Thumbnails:
+    def __init__(self, levels, colors, cache_dir, workers=None):
+        self.levels = levels
+        self.colors = [list(color) for color in colors]
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._loaded = sugargame.cache.get_cache("thumbnails")
+        self._pending = {}  # (index, size) -> Task
+        self._failed = set()  # paths of thumbnails that failed to render
+        self._executor = None
+        if not IN_BROWSER:
+            # No processes in the browser; render there on demand instead.
+            self._executor = Executor(workers=workers or os.cpu_count() or 1,
+                                      processes=True, max_pending=32)
+
+    @property
+    def event_type(self):
+        return self._executor.event_type if self._executor else None
+
+    def _path(self, index, size):
+        key = thumbnail_key(self.levels[index], size, self.colors)
+        return os.path.join(self.cache_dir, '%s-%d.png' % (key, size))
+
+    def _load(self, path):
+        return sugargame.assets.convert(pygame.image.load(path))
+
+    def _fail(self, path, error):
+        logging.error('Cannot render thumbnail %s: %s' % (path, error))
+        self._failed.add(path)
+
+    def get(self, index, size):
+        """Return the thumbnail surface, or None and start producing it."""
+        key = (index, size)
+        surface = self._loaded.get(key)
+        if surface is not None or key in self._pending:
+            return surface
+        path = self._path(index, size)
+        if path in self._failed:
+            return None  # keep the placeholder
+        try:
+            if os.path.exists(path):
+                return self._loaded.put(key, self._load(path))
+            solution = self.levels[index]["solution"]
+            if self._executor is None:
+                render_thumbnail(solution, size, self.colors, path)
+                return self._loaded.put(key, self._load(path))
+        except (pygame.error, OSError) as e:
+            self._fail(path, e)
+            return None
+        try:
+            self._pending[key] = self._executor.submit(render_thumbnail, solution, size,
+                                                       self.colors, path, tag=key)
+        except queue.Full:
+            pass  # asked again next frame
+        return None
+
+    def cancel_except(self, keep):
+        """Cancel pending renders for thumbnails scrolled out of view."""
+        for key in list(self._pending):
+            if key not in keep:
+                self._pending.pop(key).cancel()
+
+    def handle_event(self, event):
+        """Take a finished render; return True if the event was ours."""
+        if self._executor is None or event.type != self._executor.event_type:
+            return False
+        if self._pending.get(event.tag) is event.task:
+            del self._pending[event.tag]
+            error = event.error
+            if error is None:
+                try:
+                    self._loaded.put(event.tag, self._load(event.result))
+                except (pygame.error, OSError) as e:
+                    error = e
+            if error is not None:
+                self._fail(self._path(*event.tag), error)
+        return True
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)  # cancels queued renders